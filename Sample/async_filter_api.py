@@ -0,0 +1,226 @@
+import json
+import os
+
+import aiohttp
+from aiohttp import web
+
+from ttl_cache import async_ttl_cached
+from vm_index import VmDataset
+from vm_query import (AZURE_PRICING_URL, CURRENCIES_URL, BASE_CURRENCY, valid_region, vm_filter, currency_rates,
+                      convert_prices, encode_cursor, parse_paging, page_and_project)
+
+# Async variant of flask_filter_api.py (and the /azure-pricing route of common-factor/add.py).
+# Upstream pages are awaited on one shared client session, so a waiting request holds no thread.
+
+WINDOWS_EASTUS_FILTER = ("serviceName eq 'Virtual Machines' and armRegionName eq 'eastus' "
+                         "and contains(productName, 'Windows') and currencyCode eq 'USD'")
+
+CACHE_TTL = 900
+CACHE_STALE_TTL = 6 * 3600
+CACHE_MAXSIZE = 256
+UPSTREAM_CONNECTIONS = 100
+
+SESSION = web.AppKey("session", aiohttp.ClientSession)
+
+class UpstreamError(Exception):
+    pass
+
+async def fetch_json(session, url, params=None):
+    try:
+        async with session.get(url, params=params) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+    except (aiohttp.ClientError, TimeoutError) as e:
+        raise UpstreamError(str(e)) from e
+
+async def iter_pages(session, filter_string):
+    """Yields each page's Items as it arrives."""
+    data = await fetch_json(session, AZURE_PRICING_URL, {"$filter": filter_string})
+    while True:
+        yield data.get("Items", [])
+        next_page_url = data.get("NextPageLink")
+        if not next_page_url:
+            return
+        data = await fetch_json(session, next_page_url)
+
+@async_ttl_cached(maxsize=CACHE_MAXSIZE, ttl=CACHE_TTL, stale_ttl=CACHE_STALE_TTL,
+                  cache_if=lambda vm_data: "error" not in vm_data)
+async def fetch_all_vm_prices(region, currency='USD', meter_name=None, product_name=None, sku_name=None):
+    """Fetch all VM prices for a given region, without blocking the event loop."""
+    all_data = []
+    try:
+        async for items in iter_pages(app[SESSION], vm_filter(region, currency, meter_name, product_name, sku_name)):
+            all_data.extend(items)
+    except UpstreamError as e:
+        return {"error": str(e)}
+    return VmDataset(all_data)
+
+@async_ttl_cached(maxsize=1, ttl=24 * 3600, stale_ttl=24 * 3600)
+async def get_currency_rates():
+    """Fetch the currency table and return {currency code: rate from USD}."""
+    return currency_rates(await fetch_json(app[SESSION], CURRENCIES_URL))
+
+def error(message, status):
+    return web.json_response({"error": message}, status=status)
+
+routes = web.RouteTableDef()
+
+@routes.get('/vm-prices')
+async def get_vm_prices(request):
+    args = request.query
+    region = args.get('region')
+    if not region:
+        return error("Missing 'region' parameter", 400)
+    if not valid_region(region):
+        return error(f"Invalid region '{region}'", 400)
+
+    paging = parse_paging(args)
+    if isinstance(paging, str):
+        return error(paging, 400)
+    fields, offset, limit, cursor_version = paging
+
+    meter_name, product_name, sku_name = args.get('meter_name'), args.get('product_name'), args.get('sku_name')
+    if sku_name and not meter_name and not product_name:
+        # Served from the region's cached dataset and its SKU index instead of a separate crawl
+        dataset = vm_data = await fetch_all_vm_prices(region)
+        if "error" not in vm_data:
+            vm_data = vm_data.rows_for_sku(sku_name)
+    else:
+        dataset = vm_data = await fetch_all_vm_prices(region, BASE_CURRENCY, meter_name, product_name, sku_name)
+    if "error" in vm_data:
+        return web.json_response(vm_data, status=500)
+    if cursor_version is not None and cursor_version != dataset.version:
+        # Offsets into a refreshed dataset would skip or repeat rows
+        return error("The data changed since this cursor was issued; start again from the first page", 410)
+
+    currency = args.get('currency', 'USD').upper()
+    try:
+        rate = 1.0 if currency == BASE_CURRENCY else (await get_currency_rates()).get(currency)
+    except UpstreamError as e:
+        return error(str(e), 500)
+    if rate is None:
+        return error(f"Unsupported currency '{currency}'", 400)
+    page = convert_prices(page_and_project(vm_data, fields, offset, limit), currency, rate)
+
+    headers = {"X-Total-Count": str(len(vm_data))}
+    if limit is not None and offset + limit < len(vm_data):
+        headers["X-Next-Cursor"] = encode_cursor(dataset.version, offset + limit)
+    return web.json_response(page, headers=headers)
+
+@routes.get('/vm-series')
+async def get_vm_series(request):
+    region = request.query.get('region')
+    if not region:
+        return error("Missing 'region' parameter", 400)
+    if not valid_region(region):
+        return error(f"Invalid region '{region}'", 400)
+
+    vm_data = await fetch_all_vm_prices(region)
+    if "error" in vm_data:
+        return web.json_response(vm_data, status=500)
+
+    return web.json_response(vm_data.series)
+
+@routes.get('/vm-skus')
+async def get_vm_skus(request):
+    region = request.query.get('region')
+    series = request.query.get('series')
+    if not region or not series:
+        return error("Missing 'region' or 'series' parameter", 400)
+    if not valid_region(region):
+        return error(f"Invalid region '{region}'", 400)
+
+    vm_data = await fetch_all_vm_prices(region)
+    if "error" in vm_data:
+        return web.json_response(vm_data, status=500)
+
+    return web.json_response(vm_data.skus_for_series(series))
+
+@routes.get('/vm-cost')
+async def get_vm_cost(request):
+    region = request.query.get('region')
+    sku = request.query.get('sku')
+    if not region or not sku:
+        return error("Missing 'region' or 'sku' parameter", 400)
+    if not valid_region(region):
+        return error(f"Invalid region '{region}'", 400)
+
+    vm_data = await fetch_all_vm_prices(region)
+    if "error" in vm_data:
+        return web.json_response(vm_data, status=500)
+
+    matching_vms = vm_data.rows_for_sku(sku)
+    if not matching_vms:
+        return error("SKU not found", 404)
+
+    price_per_hour = matching_vms[0].get("retailPrice", 0)
+    total_cost = float(price_per_hour) * 730  # Convert hourly rate to monthly cost
+    return web.json_response({
+        "region": region,
+        "sku": sku,
+        "hourly_price": price_per_hour,
+        "monthly_cost": round(total_cost, 2)
+    })
+
+@routes.get('/azure-pricing')
+async def get_azure_pricing(request):
+    """common-factor/add.py's route; ?stream=ndjson or ?stream=array sends pages as they arrive."""
+    stream = request.query.get('stream')
+    if stream not in (None, 'ndjson', 'array'):
+        return error("stream must be 'ndjson' or 'array'", 400)
+
+    pages = iter_pages(request.app[SESSION], WINDOWS_EASTUS_FILTER)
+    if stream is None:
+        all_data = []
+        try:
+            async for items in pages:
+                all_data.extend(items)
+        except UpstreamError as e:
+            return error(str(e), 500)
+        return web.json_response({"total_records": len(all_data), "data": all_data})
+
+    response = web.StreamResponse(headers={
+        "Content-Type": "application/x-ndjson" if stream == 'ndjson' else "application/json"})
+    await response.prepare(request)
+    total_records = 0
+    failure = None
+    if stream == 'array':
+        await response.write(b'{"data": [')
+    try:
+        async for items in pages:
+            if stream == 'ndjson':
+                await response.write("".join(json.dumps(item) + "\n" for item in items).encode())
+            elif items:
+                chunk = ",".join(json.dumps(item) for item in items)
+                await response.write((("," if total_records else "") + chunk).encode())
+            total_records += len(items)
+    except UpstreamError as e:
+        failure = str(e)
+
+    if stream == 'ndjson':
+        if failure:
+            await response.write((json.dumps({"error": failure}) + "\n").encode())
+    else:
+        tail = f'], "total_records": {total_records}'
+        tail += f', "error": {json.dumps(failure)}}}' if failure else "}"
+        await response.write(tail.encode())
+    await response.write_eof()
+    return response
+
+@routes.get('/cache-stats')
+async def get_cache_stats(request):
+    return web.json_response(fetch_all_vm_prices.cache.info())
+
+async def client_session(app):
+    """One pooled upstream session for the app's lifetime."""
+    connector = aiohttp.TCPConnector(limit=UPSTREAM_CONNECTIONS)
+    app[SESSION] = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=30))
+    yield
+    await app[SESSION].close()
+
+app = web.Application()
+app.add_routes(routes)
+app.cleanup_ctx.append(client_session)
+
+if __name__ == '__main__':
+    web.run_app(app, port=int(os.environ.get("PORT", 8080)))
@@ -0,0 +1,121 @@
+import argparse
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+
+# Compares flask_filter_api.py and async_filter_api.py against stand_in_upstream.py.
+# Every request asks for a region nobody asked for before, so each one waits on a
+# full multi-page upstream crawl; that wait is what the async service overlaps.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+UPSTREAM_PORT = 8900
+FLASK_PORT = 8901
+ASYNC_PORT = 8902
+
+FLASK_RUNNER = (
+    "import sys; sys.path.insert(0, {here!r}); import flask_filter_api as api; "
+    "api.app.run(port={port}, threaded=True)"
+)
+
+def start(args, env=None):
+    return subprocess.Popen(args, cwd=HERE, env=dict(os.environ, **(env or {})),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+async def wait_until_up(session, url, timeout=15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            async with session.get(url) as response:
+                await response.read()
+                return
+        except aiohttp.ClientError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"{url} did not come up")
+
+async def run_load(base_url, requests, concurrency, label):
+    """Fires requests for distinct regions, at most concurrency at a time, and returns latencies."""
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(total=600)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, failures = [], 0
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        await wait_until_up(session, f"{base_url}/cache-stats")
+
+        async def one(i):
+            nonlocal failures
+            async with semaphore:
+                started = time.monotonic()
+                try:
+                    async with session.get(f"{base_url}/vm-prices",
+                                           params={"region": f"{label}region{i}", "limit": "10"}) as response:
+                        await response.read()
+                        if response.status != 200:
+                            failures += 1
+                except aiohttp.ClientError:
+                    failures += 1
+                latencies.append(time.monotonic() - started)
+
+        started = time.monotonic()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.monotonic() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "failures": failures,
+        "elapsed": elapsed,
+        "throughput": requests / elapsed,
+        "p50": latencies[len(latencies) // 2],
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+    }
+
+def print_result(name, result):
+    print(f"{name:<8} {result['requests']:>6} req  {result['failures']:>4} failed  "
+          f"{result['elapsed']:7.2f}s  {result['throughput']:8.1f} req/s  "
+          f"p50 {result['p50'] * 1000:8.0f} ms  p95 {result['p95'] * 1000:8.0f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Flask and async pricing services.")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.2, help="Stand-in upstream latency per page")
+    parser.add_argument("--items", type=int, default=500, help="Stand-in items per region (100 per page)")
+    args = parser.parse_args()
+
+    upstream_url = f"http://127.0.0.1:{UPSTREAM_PORT}"
+    # The Flask service publishes a snapshot per benchmark region; keep them out of the shared tmpfs
+    snapshot_dir = tempfile.mkdtemp(prefix="benchmark-snapshots-")
+    env = {
+        "AZURE_PRICING_URL": f"{upstream_url}/api/retail/prices",
+        "CURRENCIES_URL": f"{upstream_url}/api/v2/currencies/",
+        "CACHE_WARMER": "0",
+        "PRICE_SNAPSHOT_DIR": snapshot_dir,
+    }
+    processes = [
+        start([sys.executable, "stand_in_upstream.py", "--port", str(UPSTREAM_PORT),
+               "--latency", str(args.latency), "--items", str(args.items)]),
+        start([sys.executable, "-c", FLASK_RUNNER.format(here=HERE, port=FLASK_PORT)], env),
+        start([sys.executable, "async_filter_api.py"], dict(env, PORT=str(ASYNC_PORT))),
+    ]
+    try:
+        pages = -(-args.items // 100)
+        print(f"{args.requests} cold requests, concurrency {args.concurrency}, "
+              f"{pages} upstream pages x {args.latency}s each\n")
+        for name, port in (("flask", FLASK_PORT), ("async", ASYNC_PORT)):
+            result = asyncio.run(run_load(f"http://127.0.0.1:{port}", args.requests, args.concurrency, name))
+            print_result(name, result)
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
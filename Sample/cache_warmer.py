@@ -0,0 +1,97 @@
+import threading
+import time
+
+class CacheWarmer:
+    """Keeps the most requested entries of a ttl_cached function warm.
+
+    Every interval seconds it takes the top_n keys by recent request count
+    and reloads those that would go stale before the next cycle, most popular
+    first. It stops for the cycle once budget seconds have been spent, so a
+    slow upstream cannot make a cycle run into the next one.
+    """
+
+    def __init__(self, cached_func, top_n=10, interval=300, budget=120):
+        self.cached_func = cached_func
+        self.cache = cached_func.cache
+        self.top_n = top_n
+        self.interval = interval
+        self.budget = budget
+        self.refreshes = {}  # key -> details of its last warm refresh
+        self.last_cycle = None
+        self.thread = None
+        self.stopped = threading.Event()
+
+    def due(self, key):
+        """Whether key is missing or would go stale before the next cycle."""
+        age = self.cache.age(key)
+        return age is None or age + self.interval >= self.cache.ttl
+
+    def run_cycle(self):
+        """Refreshes the popular entries that are due, within the time budget."""
+        started = time.monotonic()
+        popular = self.cache.popular(self.top_n)
+        ranked = {key for key, _ in popular}
+        self.refreshes = {key: details for key, details in self.refreshes.items() if key in ranked}
+        refreshed, skipped = 0, 0
+        for key, requests in popular:
+            if not self.due(key):
+                continue
+            if time.monotonic() - started >= self.budget:
+                skipped += 1
+                continue
+
+            refresh_started = time.monotonic()
+            try:
+                ok = self.cached_func.reload(key)
+            except Exception as e:
+                print(f"[WARNING] Cache warm refresh failed for {dict(key)}: {e}")
+                ok = False
+            self.refreshes[key] = {
+                "requests": requests,
+                "ok": ok,
+                "seconds": round(time.monotonic() - refresh_started, 3),
+                "refreshed_at": time.time(),
+            }
+            refreshed += 1
+
+        self.cache.decay_requests()
+        self.last_cycle = {
+            "started_at": time.time() - (time.monotonic() - started),
+            "seconds": round(time.monotonic() - started, 3),
+            "candidates": len(popular),
+            "refreshed": refreshed,
+            "skipped_over_budget": skipped,
+        }
+        return self.last_cycle
+
+    def _loop(self):
+        while not self.stopped.wait(self.interval):
+            self.run_cycle()
+
+    def start(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.stopped.clear()
+            self.thread = threading.Thread(target=self._loop, name="cache-warmer", daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+
+    def status(self):
+        """What is being warmed, how popular it is and how long its last refresh took."""
+        popular = dict(self.cache.popular(self.top_n))
+        warming = []
+        for key, count in popular.items():
+            age = self.cache.age(key)
+            warming.append(dict(dict(key), requests=round(count, 2),
+                                age_seconds=None if age is None else round(age, 1),
+                                last_refresh=self.refreshes.get(key)))
+        return {
+            "running": self.thread is not None and self.thread.is_alive(),
+            "top_n": self.top_n,
+            "interval": self.interval,
+            "budget": self.budget,
+            "last_cycle": self.last_cycle,
+            "warming": warming,
+        }
@@ -1,26 +1,72 @@
 from flask import Flask, request, jsonify
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import math
+import os
 import requests
 
+from cache_warmer import CacheWarmer
+from http_cache import cached_json_response, make_etag
+from shared_index import snapshot_cached, build_vm_arrays, pack_items, unpack_items, find_sku_rows, find_sku_prices
+from ttl_cache import ttl_cached
+from vm_index import VmDataset
+from vm_query import (AZURE_PRICING_URL, CURRENCIES_URL, BASE_CURRENCY, valid_region, vm_filter, currency_rates,
+                      convert_prices, encode_cursor, parse_paging, page_and_project)
+
 app = Flask(__name__)
 
-# Base API Endpoint
-AZURE_PRICING_URL = "https://prices.azure.com/api/retail/prices"
+# Crawl results are fresh for CACHE_TTL seconds, then served stale while one refresh runs
+CACHE_TTL = 900
+CACHE_STALE_TTL = 6 * 3600
+CACHE_MAXSIZE = 256
+
+# The most requested crawls are refreshed ahead of expiry; set CACHE_WARMER=0 to disable
+WARM_TOP_N = 20
+WARM_INTERVAL = 300
+WARM_BUDGET = 120
+
+HOURS_PER_MONTH = 730
+BATCH_MAX_LINES = 10000
+BATCH_REGION_WORKERS = 8
+
+@lru_cache(maxsize=1)
+def get_currency_rates():
+    """Fetch the currency table once and return {currency code: rate from USD}."""
+    response = requests.get(CURRENCIES_URL, timeout=10)
+    response.raise_for_status()
+    return currency_rates(response.json())
+
+@snapshot_cached("vm-data-{region}", refresh_ahead=WARM_INTERVAL)
+def load_vm_snapshot(region):
+    """Region's VM price index and items, shared read-only by every worker process.
+
+    One worker crawls and publishes it; the others map the same pages. The
+    crawl bypasses the TTL cache, so a refresh never republishes stale items.
+    """
+    vm_data = fetch_all_vm_prices.__wrapped__(region)
+    if "error" in vm_data:
+        return None
+    return dict(build_vm_arrays(vm_data), items=pack_items(vm_data))
+
+# Per-process datasets decoded from the region snapshots: region -> (snapshot version, VmDataset)
+_vm_datasets = {}
 
+def load_vm_dataset(region):
+    """Region's full VmDataset, decoded once per snapshot version so every route serves the same crawl."""
+    snapshot = load_vm_snapshot(region)
+    if snapshot is None:
+        return {"error": f"Could not load VM prices for region '{region}'"}
+    cached = _vm_datasets.get(region)
+    if cached is None or cached[0] != snapshot.version:
+        cached = (snapshot.version, VmDataset(unpack_items(snapshot)))
+        _vm_datasets[region] = cached
+    return cached[1]
+
+@ttl_cached(maxsize=CACHE_MAXSIZE, ttl=CACHE_TTL, stale_ttl=CACHE_STALE_TTL,
+            cache_if=lambda vm_data: "error" not in vm_data)
 def fetch_all_vm_prices(region, currency='USD', meter_name=None, product_name=None, sku_name=None):
     """Fetch all VM prices for a given region from Azure Retail API with additional filters."""
-    filters = [
-        "serviceName eq 'Virtual Machines'",
-        f"armRegionName eq '{region}'",
-        f"currencyCode eq '{currency}'"
-    ]
-    if meter_name:
-        filters.append(f"meterName eq '{meter_name}'")
-    if product_name:
-        filters.append(f"productName eq '{product_name}'")
-    if sku_name:
-        filters.append(f"skuName eq '{sku_name}'")
-    
-    api_url = f"{AZURE_PRICING_URL}?$filter={' and '.join(filters)}"
+    api_url = f"{AZURE_PRICING_URL}?$filter={vm_filter(region, currency, meter_name, product_name, sku_name)}"
     
     all_data = []
     next_page_url = api_url
@@ -38,7 +84,14 @@ def fetch_all_vm_prices(region, currency='USD', meter_name=None, product_name=No
         except requests.exceptions.RequestException as e:
             return {"error": str(e)}
 
-    return all_data
+    return VmDataset(all_data)
+
+# Region snapshots serve the region-wide routes; filtered crawls go through the TTL cache
+snapshot_warmer = CacheWarmer(load_vm_snapshot, top_n=WARM_TOP_N, interval=WARM_INTERVAL, budget=WARM_BUDGET)
+warmer = CacheWarmer(fetch_all_vm_prices, top_n=WARM_TOP_N, interval=WARM_INTERVAL, budget=WARM_BUDGET)
+if os.environ.get("CACHE_WARMER", "1") != "0":
+    snapshot_warmer.start()
+    warmer.start()
 
 @app.route('/vm-prices', methods=['GET'])
 def get_vm_prices():
@@ -50,22 +103,57 @@ def get_vm_prices():
     
     if not region:
         return jsonify({"error": "Missing 'region' parameter"}), 400
+    if not valid_region(region):
+        return jsonify({"error": f"Invalid region '{region}'"}), 400
+    
+    paging = parse_paging(request.args)
+    if isinstance(paging, str):
+        return jsonify({"error": paging}), 400
+    fields, offset, limit, cursor_version = paging
     
-    vm_data = fetch_all_vm_prices(region, currency, meter_name, product_name, sku_name)
-    return jsonify(vm_data)
+    if not meter_name and not product_name:
+        # Served from the region's shared snapshot (and its SKU index) instead of a separate crawl
+        dataset = vm_data = load_vm_dataset(region)
+        if sku_name and "error" not in dataset:
+            vm_data = dataset.rows_for_sku(sku_name)
+    else:
+        dataset = vm_data = fetch_all_vm_prices(region, BASE_CURRENCY, meter_name, product_name, sku_name)
+    if "error" in vm_data:
+        return jsonify(vm_data), 500
+    if cursor_version is not None and cursor_version != dataset.version:
+        # Offsets into a refreshed dataset would skip or repeat rows
+        return jsonify({"error": "The data changed since this cursor was issued; start again from the first page"}), 410
+
+    currency = currency.upper()
+    try:
+        rate = 1.0 if currency == BASE_CURRENCY else get_currency_rates().get(currency)
+    except requests.exceptions.RequestException as e:
+        return jsonify({"error": str(e)}), 500
+    if rate is None:
+        return jsonify({"error": f"Unsupported currency '{currency}'"}), 400
+
+    headers = {"X-Total-Count": str(len(vm_data))}
+    if limit is not None and offset + limit < len(vm_data):
+        headers["X-Next-Cursor"] = encode_cursor(dataset.version, offset + limit)
+    etag = make_etag("vm-prices", dataset.version, currency, fields, offset, limit,
+                     meter_name, product_name, sku_name)
+    # Page and project the cached items first, so only what is returned gets converted and encoded
+    return cached_json_response(
+        etag, lambda: convert_prices(page_and_project(vm_data, fields, offset, limit), currency, rate), headers)
 
 @app.route('/vm-series', methods=['GET'])
 def get_vm_series():
     region = request.args.get('region')
     if not region:
         return jsonify({"error": "Missing 'region' parameter"}), 400
+    if not valid_region(region):
+        return jsonify({"error": f"Invalid region '{region}'"}), 400
     
-    vm_data = fetch_all_vm_prices(region)
+    vm_data = load_vm_dataset(region)
     if "error" in vm_data:
         return jsonify(vm_data), 500
     
-    series_set = {vm["productName"].split(" ")[2] for vm in vm_data if len(vm["productName"].split(" ")) > 2}
-    return jsonify(sorted(series_set))
+    return cached_json_response(make_etag("vm-series", vm_data.version), lambda: vm_data.series)
 
 @app.route('/vm-skus', methods=['GET'])
 def get_vm_skus():
@@ -74,13 +162,15 @@ def get_vm_skus():
     
     if not region or not series:
         return jsonify({"error": "Missing 'region' or 'series' parameter"}), 400
+    if not valid_region(region):
+        return jsonify({"error": f"Invalid region '{region}'"}), 400
     
-    vm_data = fetch_all_vm_prices(region)
+    vm_data = load_vm_dataset(region)
     if "error" in vm_data:
         return jsonify(vm_data), 500
     
-    skus = {vm["skuName"] for vm in vm_data if series in vm["productName"]}
-    return jsonify(sorted(skus))
+    return cached_json_response(make_etag("vm-skus", vm_data.version, series),
+                                lambda: vm_data.skus_for_series(series))
 
 @app.route('/vm-cost', methods=['GET'])
 def get_vm_cost():
@@ -89,24 +179,112 @@ def get_vm_cost():
     
     if not region or not sku:
         return jsonify({"error": "Missing 'region' or 'sku' parameter"}), 400
+    if not valid_region(region):
+        return jsonify({"error": f"Invalid region '{region}'"}), 400
     
-    vm_data = fetch_all_vm_prices(region, sku_name=sku)
-    if "error" in vm_data:
-        return jsonify(vm_data), 500
+    snapshot = load_vm_snapshot(region)
+    if snapshot is None:
+        return jsonify({"error": f"Could not load VM prices for region '{region}'"}), 500
     
-    matching_vms = [vm for vm in vm_data if vm["skuName"] == sku]
-    if not matching_vms:
+    start, stop = find_sku_rows(snapshot, sku)
+    if start == stop:
         return jsonify({"error": "SKU not found"}), 404
     
-    price_per_hour = matching_vms[0].get("retailPrice", 0)
+    price_per_hour = float(snapshot["retail_price"][start])
     total_cost = float(price_per_hour) * 730  # Convert hourly rate to monthly cost
     
-    return jsonify({
+    return cached_json_response(make_etag("vm-cost", snapshot.version, sku), lambda: {
         "region": region,
         "sku": sku,
         "hourly_price": price_per_hour,
         "monthly_cost": round(total_cost, 2)
     })
 
+def parse_batch_line(line):
+    """(region, sku, hours, quantity) from one batch line, or an error message."""
+    if not isinstance(line, dict):
+        return "Each line must be an object"
+    region, sku = line.get('region'), line.get('sku')
+    if not isinstance(region, str) or not isinstance(sku, str) or not region or not sku:
+        return "Missing 'region' or 'sku'"
+    if not valid_region(region):
+        return f"Invalid region '{region}'"
+    try:
+        hours = float(line.get('hours', HOURS_PER_MONTH))
+        quantity = float(line.get('quantity', 1))
+    except (TypeError, ValueError):
+        return "'hours' and 'quantity' must be numbers"
+    if not math.isfinite(hours) or not math.isfinite(quantity):
+        return "'hours' and 'quantity' must be finite numbers"
+    if hours < 0 or quantity < 0:
+        return "'hours' and 'quantity' must not be negative"
+    return region, sku, hours, quantity
+
+@app.route('/vm-cost/batch', methods=['POST'])
+def get_vm_cost_batch():
+    """Prices many (region, sku, hours, quantity) lines, loading each distinct region once."""
+    body = request.get_json(silent=True)
+    lines = body.get('lines') if isinstance(body, dict) else body
+    if not isinstance(lines, list) or not lines:
+        return jsonify({"error": "Expected a JSON list of lines, or {\"lines\": [...]}"}), 400
+    if len(lines) > BATCH_MAX_LINES:
+        return jsonify({"error": f"At most {BATCH_MAX_LINES} lines per batch"}), 400
+
+    parsed = [parse_batch_line(line) for line in lines]
+    by_region = {}
+    for pos, line in enumerate(parsed):
+        if isinstance(line, tuple):
+            by_region.setdefault(line[0], []).append(pos)
+
+    with ThreadPoolExecutor(max_workers=BATCH_REGION_WORKERS) as executor:
+        snapshots = dict(zip(by_region, executor.map(load_vm_snapshot, by_region)))
+
+    prices = [None] * len(parsed)
+    for region, positions in by_region.items():
+        if snapshots[region] is None:
+            continue
+        region_prices = find_sku_prices(snapshots[region], [parsed[pos][1] for pos in positions])
+        for pos, price in zip(positions, region_prices.tolist()):
+            prices[pos] = None if price != price else price  # NaN means the SKU is not listed
+
+    results = []
+    total_cost = 0.0
+    priced = 0
+    for line, price in zip(parsed, prices):
+        if not isinstance(line, tuple):
+            results.append({"error": line})
+            continue
+        region, sku, hours, quantity = line
+        result = {"region": region, "sku": sku, "hours": hours, "quantity": quantity}
+        if snapshots[region] is None:
+            result["error"] = f"Could not load VM prices for region '{region}'"
+        elif price is None:
+            result["error"] = "SKU not found"
+        else:
+            cost = price * hours * quantity
+            result.update(hourly_price=price, cost=round(cost, 2))
+            total_cost += cost
+            priced += 1
+        results.append(result)
+
+    return jsonify({
+        "lines": results,
+        "totals": {
+            "lines": len(results),
+            "priced": priced,
+            "unpriced": len(results) - priced,
+            "regions": len(by_region),
+            "total_cost": round(total_cost, 2),
+        },
+    })
+
+@app.route('/cache-stats', methods=['GET'])
+def get_cache_stats():
+    return jsonify(dict(fetch_all_vm_prices.cache.info(), snapshots=load_vm_snapshot.cache.info()))
+
+@app.route('/cache-warmer', methods=['GET'])
+def get_cache_warmer():
+    return jsonify(dict(warmer.status(), snapshots=snapshot_warmer.status()))
+
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,115 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+
+from flask import Response, current_app, request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+MIN_COMPRESS_SIZE = 1024
+RESPONSE_CACHE_MAXSIZE = 512
+RESPONSE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+def make_etag(*parts):
+    """Strong ETag from a dataset version plus whatever else shapes the response."""
+    return '"' + hashlib.sha1("\x1f".join(str(part) for part in parts).encode()).hexdigest() + '"'
+
+def etag_matches(if_none_match, etag):
+    """Whether an If-None-Match header covers etag (weak comparison, as RFC 9110 asks for GET)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+def accepted_encodings(accept_encoding):
+    """Content codings the client accepts, ignoring any with q=0."""
+    accepted = set()
+    for coding in (accept_encoding or "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+def preferred_encoding(accept_encoding):
+    accepted = accepted_encodings(accept_encoding)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return "identity"
+
+class ResponseCache:
+    """LRU of encoded response bodies by ETag; each encoding is compressed once, on first use.
+
+    Bounded by entry count and by the total bytes of all cached variants;
+    a response larger than max_bytes on its own is served but not cached.
+    """
+
+    def __init__(self, maxsize=RESPONSE_CACHE_MAXSIZE, max_bytes=RESPONSE_CACHE_MAX_BYTES):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # etag -> {encoding: body}
+        self.sizes = {}  # etag -> bytes held by its variants
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    def body(self, etag, encoding, build):
+        """(encoding used, body) for etag, calling build() for the uncompressed bytes on a miss.
+
+        Small bodies are always sent uncompressed.
+        """
+        with self.lock:
+            variants = self.entries.get(etag)
+            if variants is not None:
+                self.entries.move_to_end(etag)
+                if encoding in variants:
+                    return encoding, variants[encoding]
+
+        if variants is None:
+            variants = {"identity": build()}
+        identity = variants["identity"]
+        if len(identity) < MIN_COMPRESS_SIZE:
+            encoding = "identity"  # not worth compressing
+        elif encoding == "gzip":
+            variants["gzip"] = gzip.compress(identity, compresslevel=6)
+        elif encoding == "br":
+            variants["br"] = brotli.compress(identity, quality=5)
+
+        size = sum(len(body) for body in variants.values())
+        with self.lock:
+            self.total_bytes -= self.sizes.pop(etag, 0)
+            self.entries.pop(etag, None)
+            if size <= self.max_bytes:
+                self.entries[etag] = variants
+                self.sizes[etag] = size
+                self.total_bytes += size
+            while len(self.entries) > self.maxsize or self.total_bytes > self.max_bytes:
+                evicted, _ = self.entries.popitem(last=False)
+                self.total_bytes -= self.sizes.pop(evicted)
+        return (encoding, variants[encoding]) if encoding in variants else ("identity", identity)
+
+response_cache = ResponseCache()
+
+def cached_json_response(etag, build_payload, headers=None):
+    """JSON response with an ETag, 304 revalidation and cached precompressed bodies.
+
+    build_payload() is only called when no cached body exists for etag, so a
+    matching If-None-Match costs neither serialization nor compression.
+    """
+    headers = dict(headers or {}, ETag=etag, Vary="Accept-Encoding")
+    headers["Cache-Control"] = "no-cache"  # always revalidate; a 304 is cheap
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        return Response(status=304, headers=headers)
+
+    encoding = preferred_encoding(request.headers.get("Accept-Encoding"))
+    encoding, body = response_cache.body(etag, encoding,
+                                         lambda: current_app.json.dumps(build_payload()).encode())
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(body, mimetype="application/json", headers=headers)
@@ -0,0 +1,259 @@
+import fcntl
+import inspect
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from functools import wraps
+
+import numpy as np
+
+from ttl_cache import RequestCounts
+
+# tmpfs when available, so snapshots live in shared memory rather than on disk
+SNAPSHOT_ROOT = os.environ.get(
+    "PRICE_SNAPSHOT_DIR",
+    os.path.join("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "azure-pricing"),
+)
+SNAPSHOT_TTL = 3600  # seconds before a snapshot is refreshed
+
+def snapshot_link(name):
+    """Path of the "current" symlink that points at the live version of a snapshot."""
+    return os.path.join(SNAPSHOT_ROOT, f"{name}.current")
+
+def publish(name, arrays):
+    """Writes arrays as a new snapshot version and atomically makes it the current one.
+
+    Readers that already mapped the previous version keep it until they reopen;
+    its files are unlinked here but stay alive while they are mapped.
+    """
+    os.makedirs(SNAPSHOT_ROOT, exist_ok=True)
+    version = f"{name}.{time.time_ns()}.{os.getpid()}"
+    version_dir = os.path.join(SNAPSHOT_ROOT, version)
+    os.mkdir(version_dir)
+    for key, array in arrays.items():
+        np.save(os.path.join(version_dir, f"{key}.npy"), np.ascontiguousarray(array), allow_pickle=False)
+
+    link = snapshot_link(name)
+    tmp_link = f"{link}.{os.getpid()}"
+    os.symlink(version, tmp_link)
+    os.replace(tmp_link, link)
+
+    for entry in os.listdir(SNAPSHOT_ROOT):
+        if entry.startswith(f"{name}.") and entry != version and os.path.isdir(os.path.join(SNAPSHOT_ROOT, entry)):
+            shutil.rmtree(os.path.join(SNAPSHOT_ROOT, entry), ignore_errors=True)
+    return version
+
+class Snapshot:
+    """Read-only, memory-mapped view of one published snapshot version."""
+
+    def __init__(self, name, version):
+        self.name = name
+        self.version = version
+        version_dir = os.path.join(SNAPSHOT_ROOT, version)
+        self.created = os.stat(version_dir).st_mtime
+        self.arrays = {
+            entry[:-4]: np.load(os.path.join(version_dir, entry), mmap_mode="r", allow_pickle=False)
+            for entry in os.listdir(version_dir) if entry.endswith(".npy")
+        }
+
+    def __getitem__(self, key):
+        return self.arrays[key]
+
+    def is_stale(self, ttl=SNAPSHOT_TTL):
+        return time.time() - self.created > ttl
+
+# Per-process mappings, keyed by snapshot name
+_opened = {}
+
+def current_version(name):
+    """Version the current symlink points at, or None if nothing was published yet."""
+    try:
+        return os.readlink(snapshot_link(name))
+    except FileNotFoundError:
+        return None
+
+def open_snapshot(name):
+    """Maps the current version of a snapshot, reusing this process' mapping while it is current."""
+    version = current_version(name)
+    if version is None:
+        return None
+    snapshot = _opened.get(name)
+    if snapshot is None or snapshot.version != version:
+        try:
+            snapshot = Snapshot(name, version)
+        except FileNotFoundError:
+            # Replaced between readlink and open; the next call picks up the new version
+            return _opened.get(name)
+        _opened[name] = snapshot
+    return snapshot
+
+# Snapshot names this process is refreshing in the background
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+def refresh_snapshot(name, build, max_age=SNAPSHOT_TTL, wait=True):
+    """Rebuilds a snapshot with build() if it is missing or older than max_age, and returns the current one.
+
+    An exclusive file lock makes a single process do the rebuild. With wait
+    the others wait for it and then map the version it published; without,
+    they return straight away with whatever is published. build() returns a
+    dict of arrays, or None when the data could not be fetched.
+    """
+    os.makedirs(SNAPSHOT_ROOT, exist_ok=True)
+    with open(os.path.join(SNAPSHOT_ROOT, f"{name}.lock"), "w") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX if wait else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return open_snapshot(name)  # someone else is rebuilding it
+        try:
+            snapshot = open_snapshot(name)
+            if snapshot is not None and not snapshot.is_stale(max_age):
+                return snapshot
+            arrays = build()
+            if arrays is None:
+                return snapshot  # keep serving the stale version, if any
+            publish(name, arrays)
+            return open_snapshot(name)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+def _refresh_in_background(name, build, ttl):
+    try:
+        refresh_snapshot(name, build, ttl, wait=False)
+    except Exception as e:
+        print(f"[WARNING] Snapshot refresh failed for {name}: {e}")
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(name)
+
+def load_snapshot(name, build, ttl=SNAPSHOT_TTL):
+    """Returns the current snapshot, building it with build() when there is none.
+
+    A stale snapshot is returned as is while a background thread rebuilds it;
+    only one process gets the lock for that, and the rest keep serving the
+    version they have mapped. Only a missing snapshot makes the caller wait.
+    """
+    snapshot = open_snapshot(name)
+    if snapshot is None:
+        return refresh_snapshot(name, build, ttl)
+
+    if snapshot.is_stale(ttl):
+        with _refreshing_lock:
+            start = name not in _refreshing
+            _refreshing.add(name)
+        if start:
+            threading.Thread(target=_refresh_in_background, args=(name, build, ttl), daemon=True).start()
+    return snapshot
+
+class SnapshotCache:
+    """Request counts and hit statistics of one snapshot loader.
+
+    It has the age/popular/decay_requests/ttl shape CacheWarmer expects of a
+    TTLCache, so popular snapshots can be rebuilt before they go stale.
+    """
+
+    def __init__(self, name_format, ttl=SNAPSHOT_TTL, max_tracked=1024):
+        self.name_format = name_format
+        self.ttl = ttl
+        self.requests = RequestCounts(max_tracked)
+        self.lock = threading.Lock()
+        self.stats = dict.fromkeys(("hits", "stale_hits", "misses"), 0)
+
+    def name(self, key):
+        return self.name_format.format(**dict(key))
+
+    def record(self, key, snapshot):
+        """Counts a request for key, given the snapshot that was published when it came in."""
+        self.requests.add(key)
+        stat = "misses" if snapshot is None else "stale_hits" if snapshot.is_stale(self.ttl) else "hits"
+        with self.lock:
+            self.stats[stat] += 1
+
+    def age(self, key):
+        """Seconds since the snapshot for key was published, or None if there is none."""
+        snapshot = open_snapshot(self.name(key))
+        return None if snapshot is None else time.time() - snapshot.created
+
+    def popular(self, n):
+        return self.requests.popular(n)
+
+    def decay_requests(self, factor=0.5, keep=1024):
+        self.requests.decay(factor, keep)
+
+    def info(self):
+        """Counters for a stats endpoint."""
+        with self.lock:
+            lookups = sum(self.stats.values())
+            return dict(self.stats, ttl=self.ttl, tracked_keys=len(self.requests),
+                        hit_rate=round((lookups - self.stats["misses"]) / lookups, 4) if lookups else None)
+
+def snapshot_cached(name_format, ttl=SNAPSHOT_TTL, refresh_ahead=0):
+    """Decorator turning a build function into a loader of shared snapshots.
+
+    build(...) returns a dict of arrays, or None when the data could not be
+    fetched. The wrapper returns the snapshot named name_format.format(...)
+    with the bound arguments, through load_snapshot. Like ttl_cached, keys are
+    the bound arguments: wrapper.cache counts requests per key, and
+    wrapper.reload(key) rebuilds a snapshot within refresh_ahead seconds of
+    going stale, so a CacheWarmer can keep the popular ones fresh.
+    """
+    def decorator(build):
+        signature = inspect.signature(build)
+        cache = SnapshotCache(name_format, ttl)
+
+        @wraps(build)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = tuple(bound.arguments.items())
+            name = cache.name(key)
+            cache.record(key, open_snapshot(name))
+            return load_snapshot(name, lambda: build(*args, **kwargs), ttl)
+
+        def reload(key):
+            snapshot = refresh_snapshot(cache.name(key), lambda: build(**dict(key)), ttl - refresh_ahead, wait=False)
+            return snapshot is not None
+
+        wrapper.cache = cache
+        wrapper.reload = reload
+        return wrapper
+    return decorator
+
+def build_vm_arrays(vm_data):
+    """Column arrays for a region's retail VM items, sorted by SKU name.
+
+    The sort is stable, so rows of the same SKU keep the API's order.
+    """
+    skus = np.array([vm.get("skuName", "") for vm in vm_data], dtype=str)
+    order = np.argsort(skus, kind="stable")
+    return {
+        "sku_name": skus[order],
+        "product_name": np.array([vm.get("productName", "") for vm in vm_data], dtype=str)[order],
+        "meter_name": np.array([vm.get("meterName", "") for vm in vm_data], dtype=str)[order],
+        "retail_price": np.array([vm.get("retailPrice", 0) for vm in vm_data], dtype=np.float64)[order],
+    }
+
+def pack_items(items):
+    """Items as UTF-8 JSON in a uint8 array, so the whole crawl can live in a snapshot."""
+    return np.frombuffer(json.dumps(items).encode(), dtype=np.uint8)
+
+def unpack_items(snapshot, key="items"):
+    """The items stored with pack_items."""
+    return json.loads(snapshot[key].tobytes())
+
+def find_sku_rows(snapshot, sku):
+    """Row range [start, stop) of sku in a VM snapshot."""
+    skus = snapshot["sku_name"]
+    return np.searchsorted(skus, sku, side="left"), np.searchsorted(skus, sku, side="right")
+
+def find_sku_prices(snapshot, skus):
+    """Hourly price of the first row of each SKU in a VM snapshot, NaN where the SKU is missing."""
+    names = snapshot["sku_name"]
+    skus = np.asarray(skus, dtype=str)
+    if not len(names):
+        return np.full(len(skus), np.nan)
+    pos = np.minimum(np.searchsorted(names, skus, side="left"), len(names) - 1)
+    return np.where(names[pos] == skus, snapshot["retail_price"][pos], np.nan)
@@ -0,0 +1,83 @@
+import argparse
+import asyncio
+import re
+
+from aiohttp import web
+
+# Local stand-in for the retail prices and currencies APIs, for benchmarks and offline runs.
+# Every region serves the same synthetic catalog, paged like the real API.
+
+PAGE_SIZE = 100
+SERIES = ("D", "E", "F", "B", "M")
+
+def synthetic_items(region, count):
+    items = []
+    for i in range(count):
+        series = SERIES[i % len(SERIES)]
+        size = 2 ** (i // len(SERIES) % 7 + 1)
+        sku = f"{series}{size} v{i % 3 + 3}"
+        items.append({
+            "currencyCode": "USD",
+            "retailPrice": round(0.01 * size * (1 + i % 7), 4),
+            "unitPrice": round(0.01 * size * (1 + i % 7), 4),
+            "armRegionName": region,
+            "location": region,
+            "effectiveStartDate": "2024-01-01T00:00:00Z",
+            "meterId": f"meter-{i}",
+            "meterName": sku,
+            "productId": f"product-{series}",
+            "skuId": f"product-{series}/{i}",
+            "productName": f"Virtual Machines {series}{'s' if i % 2 else ''} Series",
+            "skuName": sku,
+            "serviceName": "Virtual Machines",
+            "serviceId": "DZH313Z7MMC8",
+            "serviceFamily": "Compute",
+            "unitOfMeasure": "1 Hour",
+            "type": "Consumption",
+            "isPrimaryMeterRegion": True,
+            "armSkuName": f"Standard_{sku.replace(' ', '_')}",
+        })
+    return items
+
+def filter_values(filter_string):
+    return dict(re.findall(r"(\w+) eq '([^']*)'", filter_string or ""))
+
+def make_app(items_per_region=500, latency=0.2):
+    catalog = {}
+
+    async def prices(request):
+        await asyncio.sleep(latency)
+        filters = filter_values(request.query.get("$filter"))
+        region = filters.get("armRegionName", "eastus")
+        if region not in catalog:
+            catalog[region] = synthetic_items(region, items_per_region)
+        items = [item for item in catalog[region]
+                 if all(str(item.get(field)) == value for field, value in filters.items())]
+
+        skip = int(request.query.get("$skip", 0))
+        page = items[skip:skip + PAGE_SIZE]
+        next_link = None
+        if skip + PAGE_SIZE < len(items):
+            next_link = str(request.url.update_query({"$skip": skip + PAGE_SIZE}))
+        return web.json_response({"BillingCurrency": "USD", "Items": page,
+                                  "NextPageLink": next_link, "Count": len(page)})
+
+    async def currencies(request):
+        await asyncio.sleep(latency)
+        return web.json_response({"usd": {"conversion": 1.0}, "eur": {"conversion": 0.92}, "inr": {"conversion": 83.1}})
+
+    app = web.Application()
+    app.router.add_get("/api/retail/prices", prices)
+    app.router.add_get("/api/v2/currencies/", currencies)
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a synthetic, paged retail prices API locally.")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--items", type=int, default=500, help="Items per region")
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds added to every page")
+    args = parser.parse_args()
+    web.run_app(make_app(args.items, args.latency), port=args.port)
+
+if __name__ == "__main__":
+    main()
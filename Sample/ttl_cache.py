@@ -0,0 +1,251 @@
+import asyncio
+import inspect
+import threading
+import time
+from collections import Counter, OrderedDict
+from functools import wraps
+
+class RequestCounts:
+    """Lookups per key, for cache warming.
+
+    Past max_tracked keys only the most requested half is kept, so keys
+    requested once do not pile up when nothing decays the counts.
+    """
+
+    def __init__(self, max_tracked=1024):
+        self.max_tracked = max_tracked
+        self.counts = Counter()
+        self.lock = threading.Lock()
+
+    def add(self, key):
+        with self.lock:
+            self.counts[key] += 1
+            if len(self.counts) > self.max_tracked:
+                self.counts = Counter(dict(self.counts.most_common(self.max_tracked // 2)))
+
+    def popular(self, n):
+        """The n most requested keys with their request counts."""
+        with self.lock:
+            return self.counts.most_common(n)
+
+    def decay(self, factor=0.5, keep=1024):
+        """Scales counts down so popularity follows recent traffic, and bounds the keys tracked."""
+        with self.lock:
+            self.counts = Counter({key: count * factor
+                                   for key, count in self.counts.most_common(keep) if count * factor >= 0.5})
+
+    def __len__(self):
+        return len(self.counts)
+
+class TTLCache:
+    """Bounded LRU cache whose entries go stale after ttl seconds.
+
+    A stale entry is still served for up to stale_ttl more seconds while a
+    single background thread reloads it. Past that it counts as a miss and
+    the caller loads it, with concurrent callers for the same key waiting
+    on one load instead of each starting their own.
+    """
+
+    def __init__(self, maxsize=128, ttl=300, stale_ttl=3600, max_tracked=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.entries = OrderedDict()  # key -> (loaded_at, value)
+        self.lock = threading.Lock()
+        self.key_locks = {}
+        self.refreshing = set()
+        self.requests = RequestCounts(max_tracked or 4 * maxsize)
+        self.stats = dict.fromkeys(("hits", "stale_hits", "misses", "refreshes", "refresh_errors", "evictions"), 0)
+
+    def get(self, key, load, cache_if=None):
+        """Returns the cached value for key, calling load() on a miss.
+
+        Values for which cache_if(value) is false (e.g. errors) are returned but not stored.
+        """
+        with self.lock:
+            self.requests.add(key)
+            entry = self.entries.get(key)
+            if entry is not None:
+                age = time.monotonic() - entry[0]
+                if age < self.ttl:
+                    self.stats["hits"] += 1
+                    self.entries.move_to_end(key)
+                    return entry[1]
+                if age < self.ttl + self.stale_ttl:
+                    self.stats["stale_hits"] += 1
+                    self.entries.move_to_end(key)
+                    if key not in self.refreshing:
+                        self.refreshing.add(key)
+                        threading.Thread(target=self._refresh, args=(key, load, cache_if), daemon=True).start()
+                    return entry[1]
+            key_lock = self.key_locks.setdefault(key, threading.Lock())
+
+        try:
+            with key_lock:
+                with self.lock:
+                    entry = self.entries.get(key)
+                    if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                        self.stats["hits"] += 1  # loaded by another caller while we waited
+                        return entry[1]
+                    self.stats["misses"] += 1
+                value = load()
+                self._store(key, value, cache_if)
+                return value
+        finally:
+            with self.lock:
+                self.key_locks.pop(key, None)
+
+    def _refresh(self, key, load, cache_if):
+        try:
+            value = load()
+            with self.lock:
+                self.stats["refreshes"] += 1
+            if not self._store(key, value, cache_if):
+                with self.lock:
+                    self.stats["refresh_errors"] += 1
+        except Exception:
+            with self.lock:
+                self.stats["refresh_errors"] += 1
+        finally:
+            with self.lock:
+                self.refreshing.discard(key)
+
+    def _store(self, key, value, cache_if):
+        if cache_if is not None and not cache_if(value):
+            return False
+        with self.lock:
+            self.entries[key] = (time.monotonic(), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.stats["evictions"] += 1
+        return True
+
+    def reload(self, key, load, cache_if=None):
+        """Loads key now and stores it, regardless of its age. Returns whether it was stored."""
+        return self._store(key, load(), cache_if)
+
+    def age(self, key):
+        """Seconds since key was loaded, or None if it is not cached."""
+        with self.lock:
+            entry = self.entries.get(key)
+            return None if entry is None else time.monotonic() - entry[0]
+
+    def popular(self, n):
+        """The n most requested keys with their request counts."""
+        return self.requests.popular(n)
+
+    def decay_requests(self, factor=0.5, keep=1024):
+        """Scales request counts down so popularity follows recent traffic, and bounds the keys tracked."""
+        self.requests.decay(factor, keep)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def info(self):
+        """Counters plus current size, for a stats endpoint."""
+        with self.lock:
+            lookups = self.stats["hits"] + self.stats["stale_hits"] + self.stats["misses"]
+            return dict(self.stats, size=len(self.entries), maxsize=self.maxsize,
+                        hit_rate=round((lookups - self.stats["misses"]) / lookups, 4) if lookups else None)
+
+class AsyncTTLCache(TTLCache):
+    """TTLCache for asyncio code: load is a coroutine function.
+
+    Concurrent misses for a key await one shared load task, and stale
+    entries are refreshed by a background task instead of a thread.
+    """
+
+    def __init__(self, maxsize=128, ttl=300, stale_ttl=3600):
+        super().__init__(maxsize, ttl, stale_ttl)
+        self.loading = {}  # key -> task of the load in flight
+        self.tasks = set()
+
+    async def get(self, key, load, cache_if=None):
+        self.requests.add(key)
+        entry = self.entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry[0]
+            if age < self.ttl:
+                self.stats["hits"] += 1
+                self.entries.move_to_end(key)
+                return entry[1]
+            if age < self.ttl + self.stale_ttl:
+                self.stats["stale_hits"] += 1
+                self.entries.move_to_end(key)
+                if key not in self.refreshing:
+                    self.refreshing.add(key)
+                    task = asyncio.create_task(self._refresh(key, load, cache_if))
+                    self.tasks.add(task)
+                    task.add_done_callback(self.tasks.discard)
+                return entry[1]
+
+        task = self.loading.get(key)
+        if task is None:
+            self.stats["misses"] += 1
+            task = asyncio.ensure_future(load())
+            self.loading[key] = task
+            task.add_done_callback(lambda _: self.loading.pop(key, None))
+        else:
+            self.stats["hits"] += 1  # joins the load another request started
+        value = await asyncio.shield(task)
+        self._store(key, value, cache_if)
+        return value
+
+    async def _refresh(self, key, load, cache_if):
+        try:
+            value = await load()
+            self.stats["refreshes"] += 1
+            if not self._store(key, value, cache_if):
+                self.stats["refresh_errors"] += 1
+        except Exception:
+            self.stats["refresh_errors"] += 1
+        finally:
+            self.refreshing.discard(key)
+
+    async def reload(self, key, load, cache_if=None):
+        return self._store(key, await load(), cache_if)
+
+def ttl_cached(maxsize=128, ttl=300, stale_ttl=3600, cache_if=None):
+    """Decorator putting a TTLCache in front of a function, keyed by its bound arguments.
+
+    Calls that only differ in whether a default was passed share one entry.
+    The cache is available as the wrapper's .cache attribute, and
+    wrapper.reload(key) re-runs the function for a cache key.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        cache = TTLCache(maxsize, ttl, stale_ttl)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = tuple(bound.arguments.items())
+            return cache.get(key, lambda: func(*args, **kwargs), cache_if)
+
+        def reload(key):
+            return cache.reload(key, lambda: func(**dict(key)), cache_if)
+
+        wrapper.cache = cache
+        wrapper.reload = reload
+        return wrapper
+    return decorator
+
+def async_ttl_cached(maxsize=128, ttl=300, stale_ttl=3600, cache_if=None):
+    """ttl_cached for coroutine functions, backed by an AsyncTTLCache."""
+    def decorator(func):
+        signature = inspect.signature(func)
+        cache = AsyncTTLCache(maxsize, ttl, stale_ttl)
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = tuple(bound.arguments.items())
+            return await cache.get(key, lambda: func(*args, **kwargs), cache_if)
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
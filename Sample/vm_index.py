@@ -0,0 +1,38 @@
+import hashlib
+import json
+
+class VmDataset(list):
+    """Retail VM items from one crawl, with the lookup indexes built once at ingest.
+
+    It is still a plain list of items, so it can be cached, sliced and serialized
+    like before. Lookups that used to scan every item are dictionary reads:
+    series is the sorted /vm-series response, skus_by_series maps each series
+    to its sorted /vm-skus response, and rows_by_sku maps a SKU to its rows.
+    version is a hash of the items, so a refresh that changes nothing keeps it.
+    """
+
+    def __init__(self, items):
+        super().__init__(items)
+        self.version = hashlib.sha1(json.dumps(self, sort_keys=True).encode()).hexdigest()
+        self.rows_by_sku = {}
+        self.skus_by_product = {}
+        for row, vm in enumerate(self):
+            self.rows_by_sku.setdefault(vm["skuName"], []).append(row)
+            self.skus_by_product.setdefault(vm["productName"], set()).add(vm["skuName"])
+
+        self.series = sorted({name.split(" ")[2] for name in self.skus_by_product if len(name.split(" ")) > 2})
+        # Matched by substring against the distinct product names, as /vm-skus always did
+        self.skus_by_series = {series: self.match_skus(series) for series in self.series}
+
+    def match_skus(self, series):
+        """Sorted SKUs of every product whose name contains series."""
+        return sorted(set().union(*(skus for name, skus in self.skus_by_product.items() if series in name)))
+
+    def skus_for_series(self, series):
+        """Precomputed SKUs for a known series; other values fall back to the substring match."""
+        skus = self.skus_by_series.get(series)
+        return skus if skus is not None else self.match_skus(series)
+
+    def rows_for_sku(self, sku):
+        """Items of one SKU, in crawl order."""
+        return [self[row] for row in self.rows_by_sku.get(sku, ())]
@@ -0,0 +1,101 @@
+import base64
+import os
+
+# Query handling shared by flask_filter_api.py and async_filter_api.py; only the I/O differs between them.
+
+# Base API Endpoint (overridable to point at a local stand-in upstream)
+AZURE_PRICING_URL = os.environ.get("AZURE_PRICING_URL", "https://prices.azure.com/api/retail/prices")
+CURRENCIES_URL = os.environ.get(
+    "CURRENCIES_URL", "https://azure.microsoft.com/api/v2/currencies/?culture=en-in&discount=mca&v=20250124-1339-432121")
+
+# Prices are always crawled in USD and converted locally
+BASE_CURRENCY = 'USD'
+PRICE_FIELDS = ("retailPrice", "unitPrice")
+
+def valid_region(region):
+    """Region slugs are plain alphanumerics; anything else never reaches a filter or a snapshot name."""
+    return region.isalnum()
+
+def odata_literal(value):
+    """Quoted OData string literal, with embedded quotes doubled."""
+    return "'" + value.replace("'", "''") + "'"
+
+def vm_filter(region, currency='USD', meter_name=None, product_name=None, sku_name=None):
+    """OData $filter for a region's VM prices, narrowed by any of the optional names."""
+    filters = [
+        "serviceName eq 'Virtual Machines'",
+        f"armRegionName eq {odata_literal(region)}",
+        f"currencyCode eq {odata_literal(currency)}"
+    ]
+    if meter_name:
+        filters.append(f"meterName eq {odata_literal(meter_name)}")
+    if product_name:
+        filters.append(f"productName eq {odata_literal(product_name)}")
+    if sku_name:
+        filters.append(f"skuName eq {odata_literal(sku_name)}")
+    return " and ".join(filters)
+
+def currency_rates(table):
+    """{currency code: rate from USD} from the calculator's currency table."""
+    rates = {BASE_CURRENCY: 1.0}
+    for code, info in table.items():
+        if isinstance(info, dict) and info.get("conversion"):
+            rates[code.upper()] = float(info["conversion"])
+    return rates
+
+def convert_prices(vm_data, currency, rate):
+    """Convert USD retail items to currency at rate (from currency_rates)."""
+    currency = currency.upper()
+    if currency == BASE_CURRENCY:
+        return vm_data
+
+    converted = []
+    for vm in vm_data:
+        item = dict(vm)
+        if "currencyCode" in item:
+            item["currencyCode"] = currency
+        for field in PRICE_FIELDS:
+            if field in item:
+                item[field] = item[field] * rate
+        converted.append(item)
+    return converted
+
+def encode_cursor(version, offset):
+    """Opaque cursor for offset into one version of a dataset."""
+    return base64.urlsafe_b64encode(f"{version}:{offset}".encode()).decode()
+
+def decode_cursor(cursor):
+    """(dataset version, offset) from a cursor, or None if it is not one we issued."""
+    try:
+        version, _, offset = base64.urlsafe_b64decode(cursor.encode()).decode().rpartition(":")
+        offset = int(offset)
+    except (ValueError, UnicodeDecodeError):
+        return None
+    return (version, offset) if version and offset >= 0 else None
+
+def parse_paging(args):
+    """(fields, offset, limit, cursor version) from /vm-prices query arguments, or an error message."""
+    fields = [field for field in args.get('fields', '').split(',') if field] or None
+    offset = 0
+    limit = None
+    cursor_version = None
+    if args.get('cursor'):
+        cursor = decode_cursor(args['cursor'])
+        if cursor is None:
+            return "Invalid 'cursor' parameter"
+        cursor_version, offset = cursor
+    if args.get('limit'):
+        try:
+            limit = int(args['limit'])
+        except ValueError:
+            limit = 0
+        if limit <= 0:
+            return "'limit' must be a positive integer"
+    return fields, offset, limit, cursor_version
+
+def page_and_project(vm_data, fields, offset, limit):
+    """Slice of the cached items, reduced to the requested fields (all fields when fields is None)."""
+    page = vm_data[offset:offset + limit] if limit is not None else vm_data[offset:]
+    if fields is None:
+        return page
+    return [{field: vm[field] for field in fields if field in vm} for vm in page]
@@ -0,0 +1,79 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+def payload_version(pricing_data):
+    """Digest of the payload's offer keys; a refreshed payload with other offers gets a new one."""
+    return hashlib.sha1("\0".join(sorted(pricing_data["offers"])).encode()).hexdigest()
+
+def resolve_offer_key(offers, account_type, storage_type, access_tier, redundancy, file_structure):
+    """(offer key, "exact" | "partial"), or (None, None) when nothing matches."""
+    expected_key = f"{account_type}-{storage_type}-{file_structure}-{access_tier}-{redundancy}"
+    alternative_key = f"{account_type}-{storage_type}-{access_tier}-{redundancy}"
+    partial_match = None
+
+    for key in offers:
+        if "operation" in key.lower():
+            continue  # Skip operation pricing keys
+
+        if key == expected_key:
+            return key, "exact"  # Stop searching if we find an exact match
+
+        # Partial match (ignore file structure if needed)
+        if alternative_key in key:
+            partial_match = key
+
+    if partial_match:
+        return partial_match, "partial"
+    return None, None
+
+class OfferMemo:
+    """Bounded LRU memo of resolve_offer_key results, dropped when the payload's offers change."""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.payload = None
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def resolve(self, pricing_data, account_type, storage_type, access_tier, redundancy, file_structure):
+        """Returns (offer key, match kind, hit) for a configuration, resolving it only on a miss."""
+        with self.lock:
+            if pricing_data is not self.payload:
+                version = payload_version(pricing_data)
+                if version != self.version:
+                    self.entries.clear()
+                self.payload = pricing_data
+                self.version = version
+
+            key = (self.version, account_type, storage_type, file_structure, access_tier, redundancy)
+            if key in self.entries:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return self.entries[key] + (True,)
+
+            self.misses += 1
+            result = resolve_offer_key(pricing_data["offers"], account_type, storage_type,
+                                       access_tier, redundancy, file_structure)
+            self.entries[key] = result
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)  # drop the least recently used entry
+            return result + (False,)
+
+    def stats(self):
+        """Hit/miss statistics for the memo."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+            "payload_version": self.version,
+        }
+
+# Shared by test3.py and test4.py, so repeated quotes against one payload skip the scan
+offer_memo = OfferMemo()
@@ -1,6 +1,8 @@
 import requests
 import json
 
+from offer_memo import offer_memo
+
 API_URL = "https://azure.microsoft.com/api/v3/pricing/storage/calculator/?culture=en-in&discount=mca"
 
 def fetch_pricing_data():
@@ -51,38 +53,23 @@ def debug_available_offers(pricing_data):
             print(f"  - {key}")
 
 def find_best_matching_offer(pricing_data, account_type, storage_type, access_tier, redundancy, file_structure):
-    """Finds the best matching offer key dynamically using flexible pattern matching."""
+    """Finds the best matching offer key, resolving each configuration once per payload."""
+    offer_key, match_kind, hit = offer_memo.resolve(pricing_data, account_type, storage_type,
+                                                    access_tier, redundancy, file_structure)
+    if hit:
+        return offer_key  # already resolved and reported for this payload
+
     expected_key = f"{account_type}-{storage_type}-{file_structure}-{access_tier}-{redundancy}"
-    
     print("\n[DEBUG] Searching for match using:")
     print(f"  Expected Key: {expected_key}")
 
-    exact_match = None
-    partial_match = None
-
-    for key in pricing_data["offers"]:
-        if "operation" in key.lower():
-            continue  # Skip operation pricing keys
-        
-        # Exact match
-        if key == expected_key:
-            exact_match = key
-            break  # Stop searching if we find an exact match
-        
-        # Partial match (ignore file structure if needed)
-        alternative_key = f"{account_type}-{storage_type}-{access_tier}-{redundancy}"
-        if alternative_key in key:
-            partial_match = key
-
-    if exact_match:
-        print(f"[INFO] Exact match found: {exact_match}")
-        return exact_match
-    elif partial_match:
-        print(f"[WARNING] No exact match. Using closest match: {partial_match}")
-        return partial_match
+    if match_kind == "exact":
+        print(f"[INFO] Exact match found: {offer_key}")
+    elif match_kind == "partial":
+        print(f"[WARNING] No exact match. Using closest match: {offer_key}")
     else:
         print(f"[ERROR] No valid storage offer found for {expected_key}")
-        return None
+    return offer_key
 
 def get_price_from_offer(offer, region, price_key):
     """Retrieves price from offer data safely."""
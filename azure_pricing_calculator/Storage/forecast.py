@@ -0,0 +1,120 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from operation_rates import OperationRateTable
+from storage_pricing import fetch_pricing_data
+from tiers import tier_table, graduated_cost
+
+PERCENTILES = (50, 90, 99)
+CHUNK_PATHS = 20000
+
+def simulate_paths(scenario, paths, seed):
+    """Simulates monthly cost trajectories, returning an array of shape (paths, months).
+
+    Capacity compounds by a normally distributed monthly growth rate. Operations
+    scale with capacity and get lognormal month-to-month noise around ops_median.
+    """
+    rng = np.random.default_rng(seed)
+    months = scenario["months"]
+    costs = np.empty((paths, months))
+
+    for start in range(0, paths, CHUNK_PATHS):
+        count = min(CHUNK_PATHS, paths - start)
+        growth = rng.normal(scenario["growth_mean"], scenario["growth_std"], size=(count, months))
+        capacity_gb = scenario["capacity_gb"] * np.cumprod(np.maximum(1 + growth, 0), axis=1)
+
+        noise = rng.normal(0, scenario["ops_sigma"], size=(count, months))
+        operations = scenario["ops_median"] * (capacity_gb / scenario["capacity_gb"]) * np.exp(noise)
+
+        costs[start:start + count] = (graduated_cost(capacity_gb, scenario["tier_table"])
+                                      + operations * scenario["operation_price"])
+    return costs
+
+def forecast(scenario, paths=100000, seed=None, workers=1):
+    """Runs the Monte Carlo forecast and returns P50/P90/P99 bands per month and for the total."""
+    if workers > 1:
+        seeds = np.random.SeedSequence(seed).spawn(workers)
+        shares = [paths // workers + (1 if i < paths % workers else 0) for i in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            costs = np.vstack(list(executor.map(simulate_paths, [scenario] * workers, shares, seeds)))
+    else:
+        costs = simulate_paths(scenario, paths, seed)
+
+    return {
+        "monthly": {p: band for p, band in zip(PERCENTILES, np.percentile(costs, PERCENTILES, axis=0))},
+        "total": {p: value for p, value in zip(PERCENTILES, np.percentile(costs.sum(axis=1), PERCENTILES))},
+    }
+
+def build_scenario(offers, offer_key_storage, offer_key_operations, region, capacity_gb, months,
+                   growth_mean, growth_std, ops_median, ops_sigma):
+    """Collects the pricing tables and distribution parameters for one forecast."""
+    storage_offer = offers.get(offer_key_storage)
+    operation_offer = offers.get(offer_key_operations)
+    if not storage_offer:
+        print(f"[ERROR] Storage offer key '{offer_key_storage}' NOT found in API response.")
+        return None
+    if not operation_offer:
+        print(f"[ERROR] Operation offer key '{offer_key_operations}' NOT found in API response.")
+        return None
+
+    table = tier_table(storage_offer, region)
+    if table is None:
+        print(f"[ERROR] No storage pricing for {offer_key_storage} in {region}.")
+        return None
+
+    operation_rates = OperationRateTable({"offers": {offer_key_operations: operation_offer}})
+    operation_price = operation_rates.rate(offer_key_operations, region)
+    if operation_price is None:
+        print(f"[ERROR] No operation pricing for {offer_key_operations} in {region}.")
+        return None
+
+    return {
+        "tier_table": table,
+        "operation_price": operation_price,  # Per single operation, whatever unit the offer uses
+        "capacity_gb": capacity_gb,
+        "months": months,
+        "growth_mean": growth_mean,
+        "growth_std": growth_std,
+        "ops_median": ops_median,
+        "ops_sigma": ops_sigma,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo forecast of Azure Storage cost.")
+    parser.add_argument("--region", required=True)
+    parser.add_argument("--storage-offer", required=True, help="Storage offer key")
+    parser.add_argument("--operation-offer", required=True, help="Operation offer key")
+    parser.add_argument("--capacity-gb", type=float, required=True, help="Starting capacity")
+    parser.add_argument("--months", type=int, default=36)
+    parser.add_argument("--growth-mean", type=float, default=0.03, help="Mean monthly growth rate")
+    parser.add_argument("--growth-std", type=float, default=0.02, help="Std dev of monthly growth rate")
+    parser.add_argument("--ops-median", type=float, default=0, help="Median operations in the first month")
+    parser.add_argument("--ops-sigma", type=float, default=0.25, help="Lognormal sigma of monthly operations")
+    parser.add_argument("--paths", type=int, default=100000)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--workers", type=int, default=1, help="Process pool size")
+    args = parser.parse_args()
+
+    pricing_data = fetch_pricing_data()
+    if not pricing_data:
+        return
+
+    scenario = build_scenario(pricing_data["offers"], args.storage_offer, args.operation_offer, args.region,
+                              args.capacity_gb, args.months, args.growth_mean, args.growth_std,
+                              args.ops_median, args.ops_sigma)
+    if not scenario:
+        return
+
+    bands = forecast(scenario, paths=args.paths, seed=args.seed, workers=args.workers)
+
+    print("\n=== Azure Storage Cost Forecast ===")
+    print(f"{'Month':>5} {'P50':>14} {'P90':>14} {'P99':>14}")
+    for month in range(args.months):
+        print(f"{month + 1:>5} " + " ".join(f"${bands['monthly'][p][month]:>13,.2f}" for p in PERCENTILES))
+    print(f"\nTotal over {args.months} months: "
+          + ", ".join(f"P{p} ${bands['total'][p]:,.2f}" for p in PERCENTILES))
+
+if __name__ == "__main__":
+    main()
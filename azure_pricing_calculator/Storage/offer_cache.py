@@ -0,0 +1,83 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from storage_pricing import resolve_offer_key
+
+def payload_version(pricing_data):
+    """Version token for a storage payload: a digest of its offer keys."""
+    digest = hashlib.sha1()
+    for key in sorted(pricing_data.get("offers", {})):
+        digest.update(key.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+class OfferResolutionCache:
+    """Bounded LRU memo of resolve_offer_key results, invalidated when the payload changes."""
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.payload = None
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.lock = threading.Lock()
+
+    def bind(self, pricing_data):
+        """Switches to pricing_data, dropping every entry if its offers differ from the current payload."""
+        if pricing_data is self.payload:
+            return self.version
+
+        version = payload_version(pricing_data)
+        if version != self.version and self.entries:
+            self.entries.clear()
+            self.invalidations += 1
+        self.payload = pricing_data
+        self.version = version
+        return version
+
+    def resolve(self, pricing_data, account_type, storage_type, access_tier, redundancy, file_structure):
+        """Returns (offer key, match kind, hit) for a configuration, resolving it only on a miss."""
+        with self.lock:
+            version = self.bind(pricing_data)
+            key = (version, account_type, storage_type, file_structure, access_tier, redundancy)
+
+            if key in self.entries:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return self.entries[key] + (True,)
+
+            self.misses += 1
+            result = resolve_offer_key(pricing_data["offers"], account_type, storage_type,
+                                       access_tier, redundancy, file_structure)
+            self.entries[key] = result
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+            return result + (False,)
+
+    def clear(self):
+        """Drops every cached resolution."""
+        with self.lock:
+            self.entries.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        """Hit/miss statistics for the cache."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "payload_version": self.version,
+        }
+
+# Shared cache for quotes made against the same payload snapshot
+offer_cache = OfferResolutionCache()
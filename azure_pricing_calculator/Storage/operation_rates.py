@@ -0,0 +1,77 @@
+import numpy as np
+
+# Operation price units in the order get_price_from_offer checks them, with operations per unit
+OPERATION_UNITS = {
+    "peroperation": 1,
+    "per100": 100,
+    "per1000": 1000,
+    "per10k": 10000,
+}
+
+class OperationRateTable:
+    """Per-operation rates for every operation offer and region, with the source unit kept as metadata."""
+
+    def __init__(self, pricing_data):
+        offers = {key: offer for key, offer in pricing_data["offers"].items() if "operation" in key.lower()}
+        regions = sorted({region for offer in offers.values()
+                          for unit, prices in offer.get("prices", {}).items() if unit in OPERATION_UNITS
+                          for region in prices})
+
+        self.operations = sorted(offers)
+        self.regions = regions
+        self.operation_positions = {key: pos for pos, key in enumerate(self.operations)}
+        self.region_positions = {region: pos for pos, region in enumerate(self.regions)}
+
+        # rates[operation, region] is the price of a single operation; NaN where unpriced
+        self.rates = np.full((len(self.operations), len(self.regions)), np.nan)
+        self.units = np.full((len(self.operations), len(self.regions)), None, dtype=object)
+        for row, key in enumerate(self.operations):
+            prices = offers[key].get("prices", {})
+            for unit, per_unit in OPERATION_UNITS.items():
+                for region, price in prices.get(unit, {}).items():
+                    col = self.region_positions[region]
+                    value = price.get("value") if isinstance(price, dict) else None
+                    # As in operations.py, a zero price in one unit falls through to the next unit
+                    if value is None or value <= 0 or not np.isnan(self.rates[row, col]):
+                        continue
+                    self.rates[row, col] = value / per_unit
+                    self.units[row, col] = unit
+
+    def rate(self, operation, region):
+        """Per-operation rate for one operation offer in region, or None."""
+        row = self.operation_positions.get(operation)
+        col = self.region_positions.get(region)
+        if row is None or col is None or np.isnan(self.rates[row, col]):
+            return None
+        return float(self.rates[row, col])
+
+    def source_unit(self, operation, region):
+        """The unit the rate was published in (peroperation, per100, per1000 or per10k)."""
+        row = self.operation_positions.get(operation)
+        col = self.region_positions.get(region)
+        if row is None or col is None:
+            return None
+        return self.units[row, col]
+
+    def counts_vector(self, operation_counts):
+        """Turns {operation key: count} into a count vector aligned with the table rows."""
+        counts = np.zeros(len(self.operations))
+        for operation, count in operation_counts.items():
+            if operation not in self.operation_positions:
+                print(f"[WARNING] Unknown operation '{operation}'. Skipping.")
+                continue
+            counts[self.operation_positions[operation]] += count
+        return counts
+
+    def price_workload(self, region, operation_counts):
+        """Total operation cost of a multi-operation workload in region, as one dot product."""
+        col = self.region_positions.get(region)
+        if col is None:
+            print(f"[ERROR] No operation pricing for region {region}.")
+            return None
+        return float(np.dot(np.nan_to_num(self.rates[:, col]), self.counts_vector(operation_counts)))
+
+    def price_all_regions(self, operation_counts):
+        """Operation cost of one workload in every region, as {region: cost}."""
+        costs = np.nan_to_num(self.rates).T @ self.counts_vector(operation_counts)
+        return dict(zip(self.regions, costs.tolist()))
@@ -1,6 +1,8 @@
 import requests
 import json
 
+from operation_rates import OperationRateTable
+
 # Azure Pricing API Endpoint
 STORAGE_API_URL = "https://azure.microsoft.com/api/v3/pricing/storage/calculator/?culture=en-in&discount=mca"
 
@@ -13,22 +15,9 @@ def fetch_azure_storage_pricing():
         print("[ERROR] Failed to fetch Azure Pricing data.")
         return None
 
-def get_price_from_offer(offer, region):
-    """Retrieves price based on operation type."""
-    if not offer or "prices" not in offer:
-        return None  # No valid offer
-
-    for unit in ["peroperation", "per100", "per1000", "per10k"]:
-        if unit in offer["prices"]:
-            unit_price = offer["prices"][unit].get(region, {}).get("value", 0)
-            if unit_price > 0:
-                return unit_price, unit  # Return price and unit type
-    
-    return None, None  # No valid price found
-
-def list_available_operations(storage_data):
+def list_available_operations(operation_rates):
     """Lists all available operation types."""
-    operations = list(storage_data["offers"].keys())
+    operations = operation_rates.operations
     print("\n=== Available Operations ===")
     for op in operations:
         print(op)
@@ -40,7 +29,8 @@ def main():
     if not storage_data:
         return
 
-    available_operations = list_available_operations(storage_data)
+    operation_rates = OperationRateTable(storage_data)
+    available_operations = list_available_operations(operation_rates)
 
     # User selects operation type
     operation_type = input("\nEnter Operation Type (slug): ").strip()
@@ -48,8 +38,7 @@ def main():
         print("[ERROR] Invalid operation type.")
         return
 
-    first_offer = next(iter(storage_data["offers"].values()))
-    available_regions = list(next(iter(first_offer["prices"].values())).keys())
+    available_regions = operation_rates.regions
 
     print("\n=== Available Regions ===")
     for region in available_regions:
@@ -65,22 +54,17 @@ def main():
         print("[ERROR] Invalid number of operations.")
         return
 
-    operation_offer = storage_data["offers"].get(operation_type)
-    if not operation_offer:
-        print(f"[ERROR] No valid storage offer found for {operation_type}")
-        return
-
-    unit_price, unit_type = get_price_from_offer(operation_offer, region)
-    
+    unit_price = operation_rates.rate(operation_type, region)
     if unit_price is None:
-        print("[ERROR] No valid price found.")
+        print(f"[ERROR] No valid price found for {operation_type} in {region}.")
         return
 
-    total_cost = num_operations * unit_price  # Only multiplication, no division
+    total_cost = operation_rates.price_workload(region, {operation_type: num_operations})
+    unit_type = operation_rates.source_unit(operation_type, region)
 
     # Display result in Azure-style format
     print("\n=== Pricing Breakdown ===")
-    print(f"{num_operations} × ${unit_price:.3f} = ${total_cost:.2f}")
+    print(f"{num_operations} × ${unit_price:.8f} per operation ({unit_type} pricing) = ${total_cost:.2f}")
     print(f"Region: {region}")
     print(f"Operation Type: {operation_type}")
     print(f"Number of Operations: {num_operations}")
@@ -1,6 +1,9 @@
 import requests
 import json
 
+from operation_rates import OperationRateTable
+from storage_pricing import find_best_matching_offer
+
 API_URL = "https://azure.microsoft.com/api/v3/pricing/storage/calculator/?culture=en-in&discount=mca"
 
 def fetch_pricing_data():
@@ -42,38 +45,6 @@ def extract_options(data):
 
     return options
 
-def find_best_matching_offer(pricing_data, account_type, storage_type, access_tier, redundancy, file_structure):
-    """Finds the best matching storage offer key dynamically."""
-    expected_key = f"{account_type}-{storage_type}-{file_structure}-{access_tier}-{redundancy}"
-
-    print("\n[DEBUG] Searching for match using:")
-    print(f"  Expected Key: {expected_key}")
-
-    exact_match = None
-    partial_match = None
-
-    for key in pricing_data["offers"]:
-        if "operation" in key.lower():
-            continue  # Skip operation keys
-
-        if key == expected_key:
-            exact_match = key
-            break  # Stop searching if exact match found
-        
-        alternative_key = f"{account_type}-{storage_type}-{access_tier}-{redundancy}"
-        if alternative_key in key:
-            partial_match = key
-
-    if exact_match:
-        print(f"[INFO] Exact match found: {exact_match}")
-        return exact_match
-    elif partial_match:
-        print(f"[WARNING] No exact match. Using closest match: {partial_match}")
-        return partial_match
-    else:
-        print(f"[ERROR] No valid storage offer found for {expected_key}")
-        return None
-
 def get_price_from_offer(offer, region, units):
     """Retrieves price from offer data based on available units."""
     for unit in units:
@@ -138,6 +109,7 @@ def main():
         return
 
     # Select operations
+    operation_rates = OperationRateTable(pricing_data)
     operation_costs = {}
     while True:
         print("\n=== Select an Operation ===")
@@ -154,11 +126,15 @@ def main():
             print(f"[ERROR] Operation offer '{operation_type}' not found in API.")
             continue
 
-        operation_price = get_price_from_offer(operation_offer, region, ["peroperation", "per100", "per1000", "per10k"])
-        operation_cost = num_operations * operation_price
+        operation_price = operation_rates.rate(operation_type, region)
+        if operation_price is None:
+            print(f"[ERROR] No pricing for '{operation_type}' in {region}.")
+            continue
+        operation_cost = operation_rates.price_workload(region, {operation_type: num_operations})
         operation_costs[operation_type] = operation_cost
 
-        print(f"\n{num_operations} × ${operation_price:.6f} per operation = ${operation_cost:.2f}")
+        source_unit = operation_rates.source_unit(operation_type, region)
+        print(f"\n{num_operations} × ${operation_price:.8f} per operation ({source_unit} pricing) = ${operation_cost:.2f}")
 
         # Ask if user wants to add more operations
         add_more = input("Do you want to add another operation? (yes/no): ").strip().lower()
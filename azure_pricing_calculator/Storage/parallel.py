@@ -0,0 +1,183 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from tiers import padded_graduated_cost
+
+ALIGNMENT = 64
+TASKS_PER_WORKER = 4
+
+def array_views(buffer, layout):
+    """NumPy views over a shared buffer for every (offset, shape, dtype) entry in layout."""
+    return {name: np.ndarray(shape, dtype=np.dtype(dtype), buffer=buffer, offset=offset)
+            for name, (offset, shape, dtype) in layout.items()}
+
+class SharedArrays:
+    """A set of NumPy arrays copied once into a single shared memory block.
+
+    Workers attach by the small picklable spec instead of receiving the arrays.
+    """
+
+    def __init__(self, arrays):
+        layout, offset = {}, 0
+        arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+        for name, array in arrays.items():
+            layout[name] = (offset, array.shape, array.dtype.str)
+            offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        self.spec = (self.shm.name, layout)
+        self.arrays = array_views(self.shm.buf, layout)
+        for name, array in arrays.items():
+            self.arrays[name][...] = array
+
+    def close(self):
+        """Releases and removes the shared block."""
+        self.arrays = {}
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+# Per-process attachments, keyed by shared memory name
+_attached = {}
+
+# Set in each pool process by _init_worker
+_worker = {}
+
+def attach(spec):
+    """Attaches (once per process) to a shared block and returns its array views."""
+    name, layout = spec
+    if name not in _attached:
+        shm = shared_memory.SharedMemory(name=name)
+        _attached[name] = (shm, array_views(shm.buf, layout))
+    return _attached[name][1]
+
+def _init_worker(index_spec, row_format):
+    """Pool initializer: maps the shared index and keeps the row format for formatting tasks."""
+    _worker["index"] = attach(index_spec)
+    _worker["row_format"] = row_format
+
+def _price_slice(batch_spec, start, stop):
+    """Worker task: prices batch rows [start, stop) into the shared output array."""
+    index = _worker["index"]
+
+    # The batch block may be replaced by a larger one, so map it only for the duration of the task
+    batch_shm = shared_memory.SharedMemory(name=batch_spec[0])
+    try:
+        batch = array_views(batch_shm.buf, batch_spec[1])
+        rows = batch["rows"][start:stop]
+        capacity_gb = batch["capacity_gb"][start:stop]
+        cost = padded_graduated_cost(index["lowers"], index["uppers"], index["prices"], index["filled"],
+                                     rows, capacity_gb)
+        batch["cost"][start:stop] = np.where(index["valid"][rows], cost, np.nan)
+        del batch, rows, capacity_gb
+    finally:
+        batch_shm.close()
+    return stop - start
+
+def _format_slice(start, stop):
+    """Worker task: prices grid cells [start, stop) and returns them as encoded output rows."""
+    index = _worker["index"]
+    capacities = index["capacities"]
+    combo, capacity_pos = np.divmod(np.arange(start, stop), len(capacities))
+    cost = padded_graduated_cost(index["lowers"], index["uppers"], index["prices"], index["filled"],
+                                 combo, capacities[capacity_pos])
+    cost = np.where(index["valid"][combo], cost, np.nan)
+    return _worker["row_format"].render(combo, capacity_pos, cost).encode()
+
+def partitions(size, parts):
+    """Splits range(size) into at most parts contiguous (start, stop) slices."""
+    bounds = np.linspace(0, size, parts + 1).astype(np.int64)
+    return [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+
+class ParallelPricer:
+    """Process pool that prices storage batches against a shared, read-only tier index.
+
+    The padded tier matrices are published once and mapped by every worker at
+    start-up. format_cells has the workers price and format whole slices of a
+    sweep grid, so the parent only writes bytes; price() reuses one shared
+    batch block across calls and only replaces it when a batch outgrows it.
+    """
+
+    def __init__(self, lowers, uppers, prices, filled, valid, workers=None, capacities=None, row_format=None):
+        self.workers = workers or os.cpu_count() or 1
+        arrays = {"lowers": lowers, "uppers": uppers, "prices": prices, "filled": filled, "valid": valid}
+        if capacities is not None:
+            arrays["capacities"] = np.asarray(capacities, dtype=np.float64)
+        self.index = SharedArrays(arrays)
+        self.batch = None
+        self.batch_size = 0
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                            initargs=(self.index.spec, row_format))
+
+    @classmethod
+    def for_grid(cls, grid, workers=None, row_format=None):
+        """Builds a pricer over the tier index and capacities of a sweep.SweepGrid.
+
+        row_format (a sweep.RowFormat) is needed for format_cells.
+        """
+        return cls(grid.lowers, grid.uppers, grid.prices, grid.filled, grid.valid, workers,
+                   grid.capacities, row_format)
+
+    def batch_block(self, size):
+        """The shared batch block, replaced by a larger one only when size outgrows it."""
+        if size > self.batch_size:
+            if self.batch is not None:
+                self.batch.close()
+            self.batch_size = size
+            self.batch = SharedArrays({"rows": np.zeros(size, dtype=np.int64),
+                                       "capacity_gb": np.zeros(size), "cost": np.zeros(size)})
+        return self.batch
+
+    def price(self, rows, capacity_gb):
+        """Graduated monthly cost for each (tier table row, capacity) pair, split across the pool."""
+        size = len(rows)
+        batch = self.batch_block(size)
+        batch.arrays["rows"][:size] = rows
+        batch.arrays["capacity_gb"][:size] = capacity_gb
+        slices = partitions(size, self.workers * TASKS_PER_WORKER)
+        futures = [self.executor.submit(_price_slice, batch.spec, start, stop) for start, stop in slices]
+        for future in futures:
+            future.result()
+        return batch.arrays["cost"][:size].copy()
+
+    def price_cells(self, grid, start, stop):
+        """Prices flat cells [start, stop) of a SweepGrid; same result as grid.evaluate."""
+        combo, capacity_pos = np.divmod(np.arange(start, stop), len(grid.capacities))
+        return combo, capacity_pos, self.price(combo, grid.capacities[capacity_pos])
+
+    def format_cells(self, size, chunk_size):
+        """Yields the formatted output of grid cells [0, size) in order, as bytes per slice.
+
+        Every slice is priced and formatted in a worker; at most two chunks'
+        worth of slices are in flight, which bounds memory like the serial path.
+        """
+        step = max(1, chunk_size // (self.workers * TASKS_PER_WORKER))
+        in_flight = deque()
+        for start in range(0, size, step):
+            if len(in_flight) >= 2 * self.workers * TASKS_PER_WORKER:
+                yield in_flight.popleft().result()
+            in_flight.append(self.executor.submit(_format_slice, start, min(start + step, size)))
+        while in_flight:
+            yield in_flight.popleft().result()
+
+    def close(self):
+        """Shuts the pool down and removes the shared blocks."""
+        self.executor.shutdown()
+        if self.batch is not None:
+            self.batch.close()
+        self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
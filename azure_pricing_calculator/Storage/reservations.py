@@ -0,0 +1,223 @@
+import argparse
+import json
+import re
+
+import numpy as np
+
+from storage_pricing import fetch_pricing_data
+from tiers import tier_table, padded_tier_arrays, padded_graduated_cost
+
+# Reservation term -> (price key fragment, months covered)
+TERMS = {
+    "oneyear": ("peroneyear", 12),
+    "threeyear": ("perthreeyear", 36),
+}
+
+# Reserved capacity units, in GB
+UNIT_SIZES = {"tb": 1024, "pb": 1024 * 1024}
+DEFAULT_UNIT_GB = 100 * 1024
+
+COMMITMENTS = np.array(["payg", "oneyear", "threeyear"], dtype=object)
+
+def parse_reservation_key(key):
+    """Splits a reserved-capacity offer key into (base configuration, term, unit size in GB)."""
+    term = next((term for term in TERMS if term in key), None)
+    base = key.split("-reserved-capacity")[0]
+
+    unit_gb = DEFAULT_UNIT_GB
+    size = re.search(r"(\d+)(tb|pb)", key)
+    if size:
+        unit_gb = int(size.group(1)) * UNIT_SIZES[size.group(2)]
+    return base, term, unit_gb
+
+def find_payg_offer(offers, base):
+    """Finds the pay-as-you-go storage offer matching a reservation's base configuration."""
+    if base in offers:
+        return base
+    tokens = set(base.split("-"))
+    for key in offers:
+        if "operation" in key.lower() or "reserved-capacity" in key:
+            continue
+        if tokens <= set(key.split("-")):
+            return key
+    return None
+
+def monthly_reservation_price(offer, term, region):
+    """Monthly-equivalent price of one reserved unit, mirroring get_reservation_price."""
+    prices = offer.get("prices", {})
+    if term:
+        price_key_fragment, months = TERMS[term]
+        price_key = next((key for key in prices if price_key_fragment in key.lower()), None)
+    else:
+        price_key, months = next(iter(prices), None), 1
+
+    if not price_key:
+        return None
+    value = prices[price_key].get(region, {}).get("value")
+    return None if value is None else value / months
+
+class ReservationTable:
+    """PAYG, 1-year and 3-year monthly prices per (base configuration, region, unit size), one row each.
+
+    A base can be reservable in several unit sizes (e.g. 100 TB and 1 PB); each gets its own row.
+    """
+
+    def __init__(self, pricing_data):
+        offers = pricing_data["offers"]
+        rows = {}
+        for key, offer in offers.items():
+            if "reserved-capacity" not in key.lower():
+                continue
+            base, term, unit_gb = parse_reservation_key(key)
+            payg_key = find_payg_offer(offers, base)
+            if not term or not payg_key:
+                continue
+
+            regions = next(iter(offer.get("prices", {}).values()), {})
+            for region in regions:
+                reserved = monthly_reservation_price(offer, term, region)
+                if reserved is None:
+                    continue
+                row = rows.setdefault((base, region, unit_gb), {"payg_key": payg_key, "unit_gb": unit_gb})
+                row[term] = reserved
+
+        self.keys = list(rows)
+        self.positions = {}  # (base, region) -> rows of every unit size
+        for pos, (base, region, _) in enumerate(self.keys):
+            self.positions.setdefault((base, region), []).append(pos)
+        self.payg_keys = [rows[key]["payg_key"] for key in self.keys]
+        self.unit_gb = np.array([rows[key]["unit_gb"] for key in self.keys], dtype=np.float64)
+
+        # Pay-as-you-go tier table of every row, so PAYG volume is priced at its real graduated rate
+        payg_tables = [tier_table(offers[rows[key]["payg_key"]], key[1]) for key in self.keys]
+        self.payg_valid = np.array([table is not None for table in payg_tables], dtype=bool)
+        self.payg_tiers = padded_tier_arrays(payg_tables)
+        self.reserved_monthly = {
+            term: np.array([rows[key].get(term, np.nan) for key in self.keys], dtype=np.float64)
+            for term in TERMS
+        }
+
+        # Fraction of a reserved unit that must be used before the reservation beats PAYG
+        payg_unit_cost = self.payg_cost(np.arange(len(self.keys)), self.unit_gb)
+        self.break_even = {term: prices / payg_unit_cost for term, prices in self.reserved_monthly.items()}
+
+    def payg_cost(self, rows, capacity_gb):
+        """Graduated pay-as-you-go monthly cost of capacity_gb on each row; NaN where PAYG is unpriced."""
+        capacity_gb = np.maximum(np.asarray(capacity_gb, dtype=np.float64), 0)
+        cost = padded_graduated_cost(*self.payg_tiers, rows, capacity_gb)
+        return np.where(self.payg_valid[rows], cost, np.nan)
+
+    def rows_for(self, bases, regions):
+        """Candidate rows (one per unit size) for every (base configuration, region) pair.
+
+        Returns an (accounts, unit sizes) array padded with -1 where no reservation exists.
+        """
+        candidates = [self.positions.get((base, region), []) for base, region in zip(bases, regions)]
+        rows = np.full((len(candidates), max((len(rows) for rows in candidates), default=0) or 1), -1)
+        for pos, account_rows in enumerate(candidates):
+            rows[pos, :len(account_rows)] = account_rows
+        return rows
+
+    def optimize_unit(self, rows, used_gb):
+        """Cheapest commitment for every account against a single row (unit size) each.
+
+        For each term the candidates are floor and ceil reserved units with any
+        overflow billed pay-as-you-go. PAYG volume is priced on the graduated
+        tier table at used_gb, so the overflow pays the marginal rate of the
+        tiers it falls in. Returns a dict of per-account arrays.
+        """
+        valid = rows >= 0
+        safe_rows = np.where(valid, rows, 0)
+
+        unit_gb = self.unit_gb[safe_rows]
+        payg_cost = self.payg_cost(safe_rows, used_gb)
+
+        costs = [payg_cost]
+        units = [np.zeros_like(used_gb)]
+        for term in TERMS:
+            reserved = self.reserved_monthly[term][safe_rows]
+            best_cost = np.full_like(used_gb, np.inf)
+            best_units = np.zeros_like(used_gb)
+            for count in (np.floor(used_gb / unit_gb), np.ceil(used_gb / unit_gb)):
+                overflow = payg_cost - self.payg_cost(safe_rows, np.minimum(count * unit_gb, used_gb))
+                cost = count * reserved + overflow
+                cost = np.where(np.isnan(cost), np.inf, cost)
+                better = cost < best_cost
+                best_cost = np.where(better, cost, best_cost)
+                best_units = np.where(better, count, best_units)
+            costs.append(best_cost)
+            units.append(best_units)
+
+        costs = np.vstack(costs)
+        choice = np.argmin(costs, axis=0)
+        columns = np.arange(len(used_gb))
+        monthly_cost = costs[choice, columns]
+
+        return {
+            "commitment": np.where(valid, COMMITMENTS[choice], None),
+            "reserved_units": np.where(valid, np.vstack(units)[choice, columns], 0),
+            "unit_gb": np.where(valid, unit_gb, np.nan),
+            "monthly_cost": np.where(valid, monthly_cost, np.nan),
+            "payg_cost": np.where(valid, payg_cost, np.nan),
+            "savings": np.where(valid, payg_cost - monthly_cost, np.nan),
+            "break_even_oneyear": np.where(valid, self.break_even["oneyear"][safe_rows], np.nan),
+            "break_even_threeyear": np.where(valid, self.break_even["threeyear"][safe_rows], np.nan),
+        }
+
+    def optimize(self, rows, used_gb):
+        """Cheapest commitment and unit size for every account in one vectorized pass per unit size.
+
+        rows is an array from rows_for; a 1-D array is a single candidate per account.
+        """
+        rows = np.asarray(rows)
+        if rows.ndim == 1:
+            rows = rows[:, None]
+        used_gb = np.asarray(used_gb, dtype=np.float64)
+
+        best = None
+        for column in range(rows.shape[1]):
+            result = self.optimize_unit(rows[:, column], used_gb)
+            if best is None:
+                best = result
+                continue
+            cost = np.where(np.isnan(result["monthly_cost"]), np.inf, result["monthly_cost"])
+            best_cost = np.where(np.isnan(best["monthly_cost"]), np.inf, best["monthly_cost"])
+            better = cost < best_cost
+            best = {field: np.where(better, values, best[field]) for field, values in result.items()}
+        return best
+
+def optimize_portfolio(table, accounts):
+    """Prices a portfolio of {name, base, region, used_gb} accounts and returns one row per account."""
+    rows = table.rows_for([account["base"] for account in accounts], [account["region"] for account in accounts])
+    result = {field: values.tolist() for field, values in
+              table.optimize(rows, [account["used_gb"] for account in accounts]).items()}
+    return [
+        {"name": account.get("name"), **{field: values[pos] for field, values in result.items()}}
+        for pos, account in enumerate(accounts)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description="Reserved capacity break-even and commitment optimizer.")
+    parser.add_argument("portfolio", help="JSON list of accounts with base, region and used_gb")
+    args = parser.parse_args()
+
+    pricing_data = fetch_pricing_data()
+    if not pricing_data:
+        return
+
+    with open(args.portfolio) as f:
+        accounts = json.load(f)
+
+    table = ReservationTable(pricing_data)
+    print("\n=== Reserved Capacity Recommendations ===")
+    for row in optimize_portfolio(table, accounts):
+        if row["commitment"] is None:
+            print(f"{row['name']}: no reserved capacity offer found")
+            continue
+        unit = f" of {row['unit_gb'] / 1024:,.0f} TB" if row['commitment'] != "payg" else ""
+        print(f"{row['name']}: {row['commitment']} x{int(row['reserved_units'])}{unit} -> "
+              f"${row['monthly_cost']:.2f}/month (PAYG ${row['payg_cost']:.2f}, saves ${row['savings']:.2f}; "
+              f"break-even 1y {row['break_even_oneyear']:.0%}, 3y {row['break_even_threeyear']:.0%})")
+
+if __name__ == "__main__":
+    main()
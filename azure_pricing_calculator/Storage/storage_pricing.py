@@ -50,37 +50,45 @@ def debug_available_offers(pricing_data):
         if "operation" not in key.lower():  # Filter out operation keys
             print(f"  - {key}")
 
-def find_best_matching_offer(pricing_data, account_type, storage_type, access_tier, redundancy, file_structure):
-    """Finds the best matching offer key dynamically using flexible pattern matching."""
+def resolve_offer_key(offers, account_type, storage_type, access_tier, redundancy, file_structure):
+    """Resolves a storage configuration to (offer key, "exact" | "partial"), or (None, None)."""
     expected_key = f"{account_type}-{storage_type}-{file_structure}-{access_tier}-{redundancy}"
-    
-    print("\n[DEBUG] Searching for match using:")
-    print(f"  Expected Key: {expected_key}")
+    alternative_key = f"{account_type}-{storage_type}-{access_tier}-{redundancy}"
 
-    exact_match = None
     partial_match = None
-
-    for key in pricing_data["offers"]:
+    for key in offers:
         if "operation" in key.lower():
             continue  # Skip operation pricing keys
-        
+
         if key == expected_key:
-            exact_match = key
-            break  # Stop searching if we find an exact match
-        
-        alternative_key = f"{account_type}-{storage_type}-{access_tier}-{redundancy}"
+            return key, "exact"  # Stop searching if we find an exact match
+
         if alternative_key in key:
             partial_match = key
 
-    if exact_match:
-        print(f"[INFO] Exact match found: {exact_match}")
-        return exact_match
-    elif partial_match:
-        print(f"[WARNING] No exact match. Using closest match: {partial_match}")
-        return partial_match
+    if partial_match:
+        return partial_match, "partial"
+    return None, None
+
+def find_best_matching_offer(pricing_data, account_type, storage_type, access_tier, redundancy, file_structure):
+    """Finds the best matching offer key, resolving each configuration once per payload."""
+    from offer_cache import offer_cache  # offer_cache imports resolve_offer_key from here
+
+    offer_key, match_kind, hit = offer_cache.resolve(pricing_data, account_type, storage_type,
+                                                     access_tier, redundancy, file_structure)
+    if hit:
+        return offer_key  # already resolved and reported for this payload
+
+    expected_key = f"{account_type}-{storage_type}-{file_structure}-{access_tier}-{redundancy}"
+    print("\n[DEBUG] Searching for match using:")
+    print(f"  Expected Key: {expected_key}")
+    if match_kind == "exact":
+        print(f"[INFO] Exact match found: {offer_key}")
+    elif match_kind == "partial":
+        print(f"[WARNING] No exact match. Using closest match: {offer_key}")
     else:
         print(f"[ERROR] No valid storage offer found for {expected_key}")
-        return None
+    return offer_key
 
 def get_graduated_price(offer, region, capacity_gb):
     """Calculates cost based on graduated pricing tiers."""
@@ -0,0 +1,188 @@
+import argparse
+import itertools
+import json
+import sys
+
+import numpy as np
+
+from offer_cache import offer_cache
+from parallel import ParallelPricer
+from storage_pricing import fetch_pricing_data, extract_options
+from tiers import tier_table, padded_tier_arrays, padded_graduated_cost
+
+# Configuration axes, outermost first; capacity is always the innermost axis
+AXES = ("account_type", "storage_type", "file_structure", "access_tier", "redundancy", "region")
+OPTION_NAMES = {
+    "account_type": "account_types",
+    "storage_type": "storage_types",
+    "file_structure": "file_structures",
+    "access_tier": "access_tiers",
+    "redundancy": "redundancies",
+    "region": "regions",
+}
+CSV_HEADER = ",".join(AXES + ("offer_key", "capacity_gb", "monthly_cost"))
+
+def parse_capacity_axis(spec):
+    """Parses "start:stop:count[:log]" or a comma separated list of capacities in GB."""
+    if ":" not in spec:
+        return np.array([float(value) for value in spec.split(",")])
+
+    parts = spec.split(":")
+    start, stop, count = float(parts[0]), float(parts[1]), int(parts[2])
+    if len(parts) > 3 and parts[3] == "log":
+        return np.geomspace(start, stop, count)
+    return np.linspace(start, stop, count)
+
+def parse_axis(spec, available):
+    """Parses a comma separated axis, where "all" means every slug the payload offers."""
+    if spec == "all":
+        return sorted(available)
+    return [value.strip() for value in spec.split(",") if value.strip()]
+
+class SweepGrid:
+    """Cartesian product of storage configurations x capacities, priced lazily in chunks."""
+
+    def __init__(self, pricing_data, axes, capacities):
+        self.axes = axes
+        self.capacities = np.asarray(capacities, dtype=np.float64)
+        self.combos = list(itertools.product(*(axes[name] for name in AXES)))
+        self.size = len(self.combos) * len(self.capacities)
+
+        # One padded tier table per configuration so a chunk can mix configurations
+        offer_keys, tables = [], []
+        for account_type, storage_type, file_structure, access_tier, redundancy, region in self.combos:
+            offer_key, _, _ = offer_cache.resolve(pricing_data, account_type, storage_type,
+                                                  access_tier, redundancy, file_structure)
+            offer_keys.append(offer_key)
+            tables.append(tier_table(pricing_data["offers"][offer_key], region) if offer_key else None)
+
+        self.valid = np.array([table is not None for table in tables])
+        self.lowers, self.uppers, self.prices, self.filled = padded_tier_arrays(tables)
+        self.offer_keys = offer_keys
+
+    def evaluate(self, start, stop):
+        """Prices flat cells [start, stop) and returns (configuration index, capacity index, cost) arrays."""
+        cells = np.arange(start, stop)
+        combo, capacity_pos = np.divmod(cells, len(self.capacities))
+        capacity_gb = self.capacities[capacity_pos]
+
+        cost = padded_graduated_cost(self.lowers, self.uppers, self.prices, self.filled, combo, capacity_gb)
+        return combo, capacity_pos, np.where(self.valid[combo], cost, np.nan)
+
+    def chunks(self, chunk_size=1_000_000, pricer=None):
+        """Yields evaluated chunks in grid order; memory is bounded by chunk_size.
+
+        With a parallel.ParallelPricer each chunk is split across its process pool.
+        """
+        for start in range(0, self.size, chunk_size):
+            stop = min(start + chunk_size, self.size)
+            yield pricer.price_cells(self, start, stop) if pricer else self.evaluate(start, stop)
+
+def csv_prefixes(grid):
+    """Per-configuration CSV row prefixes, built once."""
+    return [",".join(combo + (offer_key or "",)) for combo, offer_key in zip(grid.combos, grid.offer_keys)]
+
+def ndjson_prefixes(grid):
+    """Per-configuration NDJSON row prefixes, built once."""
+    prefixes = []
+    for combo, offer_key in zip(grid.combos, grid.offer_keys):
+        fields = json.dumps({**dict(zip(AXES, combo)), "offer_key": offer_key})
+        prefixes.append(fields[:-1] + ', "capacity_gb": ')
+    return prefixes
+
+class RowFormat:
+    """How priced cells become output lines.
+
+    Picklable, so pool workers can format their own slices of the grid.
+    """
+
+    def __init__(self, header, prefixes, capacity_labels, missing, suffix):
+        self.header = header
+        self.prefixes = prefixes
+        self.capacity_labels = capacity_labels
+        self.missing = missing
+        self.suffix = suffix
+
+    def render(self, combo, capacity_pos, cost):
+        """Output lines for parallel arrays of configuration index, capacity index and cost."""
+        prefixes, capacity_labels, missing, suffix = self.prefixes, self.capacity_labels, self.missing, self.suffix
+        return "".join(
+            prefixes[c] + capacity_labels[k] + (missing if v != v else repr(v)) + suffix
+            for c, k, v in zip(combo.tolist(), capacity_pos.tolist(), cost.tolist())
+        )
+
+def row_format(grid, output_format="csv"):
+    """RowFormat for a grid as CSV or NDJSON."""
+    if output_format == "csv":
+        prefixes = [prefix + "," for prefix in csv_prefixes(grid)]
+        header, separator, suffix, missing = CSV_HEADER + "\n", ",", "\n", ""
+    else:
+        prefixes = ndjson_prefixes(grid)
+        header, separator, suffix, missing = "", ', "monthly_cost": ', "}\n", "null"
+
+    # Capacity labels repeat for every configuration, so format them once
+    capacity_labels = [repr(capacity) + separator for capacity in grid.capacities.tolist()]
+    return RowFormat(header, prefixes, capacity_labels, missing, suffix)
+
+def write_sweep(grid, out, rows, chunk_size=1_000_000, pricer=None):
+    """Streams the priced grid to the binary stream out, formatted by the RowFormat rows.
+
+    With a parallel.ParallelPricer built with the same RowFormat, workers price
+    and format whole slices and this process only writes them in order.
+    """
+    out.write(rows.header.encode())
+    if pricer:
+        for data in pricer.format_cells(grid.size, chunk_size):
+            out.write(data)
+        return
+
+    for combo, capacity_pos, cost in grid.chunks(chunk_size):
+        out.write(rows.render(combo, capacity_pos, cost).encode())
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep Azure Storage pricing over a grid of configurations.")
+    parser.add_argument("--capacity", required=True, help='Capacities in GB: "start:stop:count[:log]" or "a,b,c"')
+    parser.add_argument("--account-types", default="general-purpose-v2")
+    parser.add_argument("--storage-types", default="block-blob")
+    parser.add_argument("--file-structures", default="flat")
+    parser.add_argument("--access-tiers", default="all")
+    parser.add_argument("--redundancies", default="all")
+    parser.add_argument("--regions", default="all")
+    parser.add_argument("--format", choices=("csv", "ndjson"), default="csv")
+    parser.add_argument("--output", help="Output file (default: stdout)")
+    parser.add_argument("--chunk-size", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=1, help="Price chunks on a process pool of this size")
+    args = parser.parse_args()
+
+    pricing_data = fetch_pricing_data()
+    if not pricing_data:
+        return
+
+    options = extract_options(pricing_data)
+    specs = {
+        "account_type": args.account_types,
+        "storage_type": args.storage_types,
+        "file_structure": args.file_structures,
+        "access_tier": args.access_tiers,
+        "redundancy": args.redundancies,
+        "region": args.regions,
+    }
+    axes = {name: parse_axis(spec, options[OPTION_NAMES[name]]) for name, spec in specs.items()}
+    grid = SweepGrid(pricing_data, axes, parse_capacity_axis(args.capacity))
+    print(f"[INFO] Sweeping {grid.size:,} cells", file=sys.stderr)
+
+    rows = row_format(grid, args.format)
+    pricer = ParallelPricer.for_grid(grid, args.workers, rows) if args.workers > 1 else None
+    try:
+        if args.output:
+            with open(args.output, "wb") as out:
+                write_sweep(grid, out, rows, args.chunk_size, pricer)
+        else:
+            sys.stdout.flush()
+            write_sweep(grid, sys.stdout.buffer, rows, args.chunk_size, pricer)
+    finally:
+        if pricer:
+            pricer.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import numpy as np
+
+def tier_table(offer, region):
+    """Returns (lower bounds, upper bounds, per-GB prices) for an offer's pricing in region.
+
+    Graduated tiers follow get_graduated_price: each tier's "limit" is the number of
+    GB it covers. The last tier is left open so capacity past it is still billed.
+    A flat per-GB price becomes a single open tier. Returns None if the region has no price.
+    """
+    tiers = offer.get("graduatedPrices", {}).get("pergb", {}).get(region, {}).get("prices", [])
+    if tiers:
+        widths = np.array([tier["limit"] for tier in tiers], dtype=np.float64)
+        prices = np.array([tier["price"]["value"] for tier in tiers], dtype=np.float64)
+    else:
+        flat_price = offer.get("prices", {}).get("pergb", {}).get(region, {}).get("value")
+        if flat_price is None:
+            return None
+        widths = np.array([np.inf])
+        prices = np.array([flat_price], dtype=np.float64)
+
+    uppers = np.cumsum(widths)
+    uppers[-1] = np.inf
+    lowers = np.concatenate(([0.0], uppers[:-1]))
+    return lowers, uppers, prices
+
+def graduated_cost(capacity_gb, table):
+    """Vectorized graduated storage cost for an array of capacities (any shape)."""
+    lowers, uppers, prices = table
+    # Cost of filling every tier below tier i completely
+    filled = np.concatenate(([0.0], np.cumsum((uppers[:-1] - lowers[:-1]) * prices[:-1])))
+
+    capacity_gb = np.maximum(np.asarray(capacity_gb, dtype=np.float64), 0)
+    tier = np.searchsorted(uppers, capacity_gb, side="left")
+    return filled[tier] + (capacity_gb - lowers[tier]) * prices[tier]
+
+def padded_tier_arrays(tables):
+    """Stacks tier tables of different lengths into padded (lowers, uppers, prices, filled) matrices.
+
+    Rows for missing tables (None) are left as a single open zero-price tier.
+    """
+    width = max((len(table[0]) for table in tables if table), default=1)
+    lowers = np.zeros((len(tables), width))
+    uppers = np.full((len(tables), width), np.inf)
+    prices = np.zeros((len(tables), width))
+    for row, table in enumerate(tables):
+        if table:
+            count = len(table[0])
+            lowers[row, :count], uppers[row, :count], prices[row, :count] = table
+    spans = np.where(np.isinf(uppers), 0, uppers - lowers)
+    filled = np.cumsum(spans * prices, axis=1)[:, :-1]
+    filled = np.concatenate((np.zeros((len(tables), 1)), filled), axis=1)
+    return lowers, uppers, prices, filled
+
+def padded_graduated_cost(lowers, uppers, prices, filled, rows, capacity_gb):
+    """Graduated cost where each capacity is priced with the tier table in its own row."""
+    tier = np.count_nonzero(uppers[rows] < capacity_gb[:, None], axis=1)
+    return filled[rows, tier] + (capacity_gb - lowers[rows, tier]) * prices[rows, tier]
@@ -1,8 +1,15 @@
 import requests
+from concurrent.futures import ThreadPoolExecutor
 
 # Base URL for all the APIs
 BASE_URL = "https://azure.microsoft.com/api/v2"
 
+# Calculator payloads used by the cost estimators
+VM_PRICING_URL = "https://azure.microsoft.com/api/v4/pricing/virtual-machines/calculator/{region}/?culture=en-in"
+DISK_PRICING_URL = "https://azure.microsoft.com/api/v2/pricing/managed-disks/calculator/?culture=en-in"
+BANDWIDTH_PRICING_URL = "https://azure.microsoft.com/api/v2/pricing/bandwidth/calculator/?culture=en-in"
+STORAGE_PRICING_URL = "https://azure.microsoft.com/api/v3/pricing/storage/calculator/?culture=en-in&discount=mca"
+
 # Fetch categories (e.g., Compute, Storage, etc.)
 def get_categories():
     url = f"{BASE_URL}/pricing/categories/calculator/?culture=en-in&discount=mca&v=20250124-1339-432121"
@@ -47,3 +54,14 @@ def fetch_data(url):
     except requests.exceptions.RequestException as e:
         print(f"Error fetching data: {e}")
         return None
+
+# Fetch several URLs concurrently, each one exactly once
+def fetch_many(urls, max_workers=8):
+    """Return {url: parsed JSON or None} for every distinct URL in urls."""
+    unique_urls = list(dict.fromkeys(urls))
+    if not unique_urls:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(unique_urls))) as executor:
+        payloads = executor.map(fetch_data, unique_urls)
+        return dict(zip(unique_urls, payloads))
@@ -0,0 +1,187 @@
+import re
+
+import numpy as np
+
+from api_handler import BANDWIDTH_PRICING_URL, fetch_data
+
+SIZE_UNITS = {"gb": 1, "tb": 1024, "pb": 1024 * 1024}
+SIZE = r"(\d+(?:\.\d+)?)(gb|tb|pb)"
+
+def parse_size(number, unit):
+    """Converts a size token from an offer key to GB."""
+    return float(number) * SIZE_UNITS[unit]
+
+# Offer family used when a caller prices plain internet egress
+INTERNET_EGRESS = "internet"
+
+TIER_TOKEN = r"(?:first-|next-|over-)" + SIZE + r"|" + SIZE + r"-" + SIZE
+
+def egress_family(offer_key):
+    """Offer family of an egress tier: its key with the tier token removed.
+
+    "internet-egress-first-5gb" and "internet-egress-next-10tb" are both tiers of
+    "internet-egress"; a key without a tier token is a family of its own.
+    """
+    family = re.sub(TIER_TOKEN, "", offer_key.lower())
+    return re.sub(r"-{2,}", "-", family).strip("-")
+
+def tier_order(offer_key):
+    """Sort key that puts a family's tiers in volume order: first-, ranges, next- by size, over-."""
+    key = offer_key.lower()
+    size_range = re.search(SIZE + r"-" + SIZE, key)
+    if size_range:
+        return 1, parse_size(*size_range.group(1, 2))
+    for rank, prefix in ((0, "first-"), (2, "next-"), (3, "over-")):
+        match = re.search(prefix + SIZE, key)
+        if match:
+            return rank, parse_size(*match.group(1, 2))
+    return 0, 0.0
+
+def tier_bounds(offer_key, previous_upper):
+    """Works out (lower GB, upper GB) of an egress tier from its offer key.
+
+    Understands "first-5gb", "next-10tb", "over-150tb" and "10tb-50tb" style keys;
+    a key without sizes is a single flat tier. previous_upper is the upper bound
+    of the tier before it in tier_order, which is where a "next-" tier starts.
+    An "over-" tier never starts before that either: Azure's "next-" chain can
+    end past the "over-" size (first 100 GB + next 10/40/100/350 TB is past 500 TB).
+    """
+    key = offer_key.lower()
+    size_range = re.search(SIZE + r"-" + SIZE, key)
+    if size_range:
+        return parse_size(*size_range.group(1, 2)), parse_size(*size_range.group(3, 4))
+
+    for prefix, bounds in (
+        ("first-", lambda size: (0.0, size)),
+        ("next-", lambda size: (previous_upper, previous_upper + size)),
+        ("over-", lambda size: (max(size, previous_upper), np.inf)),
+    ):
+        match = re.search(prefix + SIZE, key)
+        if match:
+            return bounds(parse_size(*match.group(1, 2)))
+    return 0.0, np.inf
+
+def graduated_tiers(offer, price_key):
+    """Tiers from an offer's graduatedPrices, where each "limit" is the tier width in GB."""
+    prices = offer.get("graduatedPrices", {}).get("pergb", {}).get(price_key, {}).get("prices", [])
+    tiers, lower = [], 0.0
+    for tier in prices:
+        upper = lower + tier["limit"]
+        tiers.append((lower, upper, tier["price"]["value"]))
+        lower = upper
+    return tiers
+
+class BandwidthPricing:
+    """Tiered outbound data transfer prices per offer family and region or zone, loaded once.
+
+    Each family (internet egress, inter-region transfer, ...) has its own tier
+    table, so a flat transfer price never lands among another family's tiers.
+    """
+
+    def __init__(self, payload):
+        tiers = {}
+        flat_offers = {}
+        for bw_name, bw_info in payload.get("offers", {}).items():
+            if "outbound" not in bw_name.lower():
+                continue
+            family = egress_family(bw_name)
+
+            for price_key in bw_info.get("graduatedPrices", {}).get("pergb", {}):
+                tiers.setdefault((family, price_key), []).extend(graduated_tiers(bw_info, price_key))
+
+            for price_key, price in bw_info.get("prices", {}).items():
+                if not isinstance(price, dict) or price.get("value") is None:
+                    continue
+                flat_offers.setdefault((family, price_key), []).append((bw_name, float(price["value"])))
+
+        # "next-" tiers start where the previous tier ends, so bounds are derived in volume order
+        for table_key, offers in flat_offers.items():
+            previous_upper = 0.0
+            for bw_name, value in sorted(offers, key=lambda offer: tier_order(offer[0])):
+                lower, upper = tier_bounds(bw_name, previous_upper)
+                previous_upper = upper
+                tiers.setdefault(table_key, []).append((lower, upper, value))
+
+        # Regions priced through a billing zone rather than directly
+        self.region_zones = {item["slug"]: item.get("zone") or item.get("billingZone")
+                             for item in payload.get("regions", []) if isinstance(item, dict) and "slug" in item}
+
+        self.families = sorted({family for family, _ in tiers})
+        self.tables = {}
+        for table_key, entries in tiers.items():
+            entries = sorted(set(entries))
+            lowers = np.array([entry[0] for entry in entries])
+            uppers = np.array([entry[1] for entry in entries])
+            if not np.array_equal(lowers[1:], uppers[:-1]):
+                # Overlapping tiers would bill a volume twice, and a gap would bill it at the wrong rate
+                print(f"[WARNING] Egress tiers of {table_key} are not contiguous; joining them.")
+                lowers[1:] = uppers[:-1]
+            prices = np.array([entry[2] for entry in entries])
+            uppers[-1] = np.inf  # Volume past the last published tier stays at its price
+            filled = np.concatenate(([0.0], np.cumsum((uppers[:-1] - lowers[:-1]) * prices[:-1])))
+            self.tables[table_key] = (lowers, uppers, prices, filled)
+
+    def resolve_family(self, family):
+        """Family key for a name: an exact family, else the only family containing it (None if ambiguous)."""
+        family = family.lower()
+        if family in self.families:
+            return family
+        matches = [name for name in self.families if family in name]
+        if len(matches) != 1:
+            print(f"[WARNING] Egress family '{family}' matches {len(matches)} offer families.")
+            return None
+        return matches[0]
+
+    def table_for(self, family, region):
+        """Tier table of a family that applies to region, looked up directly or through its billing zone."""
+        family = self.resolve_family(family)
+        return self.tables.get((family, region)) or self.tables.get((family, self.region_zones.get(region)))
+
+    def cost(self, family, region, egress_gb):
+        """Monthly egress cost of a family for a scalar or array of monthly volumes in region (None if unpriced)."""
+        table = self.table_for(family, region)
+        if table is None:
+            return None
+        lowers, uppers, prices, filled = table
+
+        egress_gb = np.maximum(np.asarray(egress_gb, dtype=np.float64), 0)
+        tier = np.searchsorted(uppers, egress_gb, side="left")
+        return filled[tier] + (egress_gb - lowers[tier]) * prices[tier]
+
+    def cost_many(self, family, regions, egress_gb):
+        """Egress cost of a family for parallel arrays of regions and volumes; NaN where a region is unpriced."""
+        regions = np.asarray(regions, dtype=object)
+        egress_gb = np.asarray(egress_gb, dtype=np.float64)
+        costs = np.full(len(egress_gb), np.nan)
+        family = self.resolve_family(family)
+        if family is None:
+            return costs
+        for region in set(regions.tolist()):
+            rows = regions == region
+            region_costs = self.cost(family, region, egress_gb[rows])
+            if region_costs is not None:
+                costs[rows] = region_costs
+        return costs
+
+# Loaded on first use and shared by every caller in the process
+_bandwidth_pricing = None
+
+def load_bandwidth_pricing(refresh=False):
+    """Returns the shared BandwidthPricing, fetching the bandwidth payload only once."""
+    global _bandwidth_pricing
+    if _bandwidth_pricing is None or refresh:
+        data = fetch_data(BANDWIDTH_PRICING_URL)
+        if not data or "offers" not in data:
+            print("Error: Could not retrieve bandwidth pricing.")
+            return None
+        _bandwidth_pricing = BandwidthPricing(data)
+    return _bandwidth_pricing
+
+def get_bandwidth_cost(region, bandwidth_usage, family=INTERNET_EGRESS):
+    """Retrieve the tiered cost of Bandwidth usage"""
+    pricing = load_bandwidth_pricing()
+    cost = pricing.cost(family, region, bandwidth_usage) if pricing else None
+    if cost is None:
+        print("Bandwidth pricing not found or unavailable.")
+        return 0
+    return float(cost)
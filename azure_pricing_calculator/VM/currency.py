@@ -0,0 +1,44 @@
+import numpy as np
+
+from api_handler import get_currencies
+
+BASE_CURRENCY = "USD"
+
+# Conversion rates from USD, loaded once per process
+_currency_rates = None
+
+def load_currency_rates(refresh=False):
+    """Returns {currency code: rate from USD}, fetching the currency table only once."""
+    global _currency_rates
+    if _currency_rates is not None and not refresh:
+        return _currency_rates
+
+    currencies = get_currencies()
+    if not currencies:
+        print("[ERROR] Could not retrieve currency table.")
+        return _currency_rates or {BASE_CURRENCY: 1.0}
+
+    rates = {BASE_CURRENCY: 1.0}
+    for code, info in currencies.items():
+        if isinstance(info, dict) and info.get("conversion"):
+            rates[code.upper()] = float(info["conversion"])
+    _currency_rates = rates
+    return rates
+
+def conversion_rate(currency):
+    """Rate to multiply a USD price by to express it in currency, or None if unknown."""
+    return load_currency_rates().get(currency.upper())
+
+def convert(usd_prices, currency):
+    """Converts a USD price or price array to currency with one vectorized multiply."""
+    rate = conversion_rate(currency)
+    if rate is None:
+        print(f"[ERROR] Unknown currency '{currency}'.")
+        return None
+    return np.asarray(usd_prices, dtype=np.float64) * rate
+
+def convert_to_many(usd_prices, currencies):
+    """Converts one USD price array to several currencies, returning {currency: array}."""
+    usd_prices = np.asarray(usd_prices, dtype=np.float64)
+    rates = load_currency_rates()
+    return {currency: usd_prices * rates[currency.upper()] for currency in currencies if currency.upper() in rates}
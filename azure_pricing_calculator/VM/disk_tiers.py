@@ -0,0 +1,103 @@
+from bisect import bisect_left
+
+import numpy as np
+
+from api_handler import DISK_PRICING_URL, fetch_data
+
+def disk_family(offer_key):
+    """Family part of a disk offer key, e.g. "premiumssd" for "premiumssd-p10"."""
+    return offer_key.rsplit("-", 1)[0] if "-" in offer_key else offer_key
+
+class DiskTierTable:
+    """Provisioned disk tiers per family, sorted by size, with a tier x region price matrix."""
+
+    def __init__(self, payload):
+        families = {}
+        regions = set()
+        for disk_name, disk_info in payload.get("offers", {}).items():
+            size = disk_info.get("size") or disk_info.get("diskSize")
+            if not size:
+                continue
+            prices = {region: float(price["value"]) for region, price in disk_info.get("prices", {}).items()
+                      if isinstance(price, dict) and price.get("value") is not None}
+            families.setdefault(disk_family(disk_name), []).append((float(size), disk_name, prices))
+            regions.update(prices)
+
+        self.offer_sizes = {tier[1]: tier[0] for tiers in families.values() for tier in tiers}
+        self.regions = sorted(regions)
+        self.region_positions = {region: pos for pos, region in enumerate(self.regions)}
+        self.families = {}
+        for family, tiers in families.items():
+            tiers.sort(key=lambda tier: tier[0])
+            matrix = np.full((len(tiers), len(self.regions)), np.nan)
+            for row, (_, _, prices) in enumerate(tiers):
+                for region, price in prices.items():
+                    matrix[row, self.region_positions[region]] = price
+            self.families[family] = {
+                "sizes": [tier[0] for tier in tiers],
+                "size_array": np.array([tier[0] for tier in tiers]),
+                "tiers": np.array([tier[1] for tier in tiers], dtype=object),
+                "prices": matrix,
+            }
+
+    def family_of(self, disk_type):
+        """Family for a disk type given either as a family name or as a full offer key."""
+        return disk_type if disk_type in self.families else disk_family(disk_type)
+
+    def tier_for(self, family, size_gb):
+        """Offer key of the smallest tier in family that holds size_gb, or None."""
+        table = self.families.get(family)
+        if not table:
+            return None
+        pos = bisect_left(table["sizes"], size_gb)
+        return table["tiers"][pos] if pos < len(table["sizes"]) else None
+
+    def price(self, family, size_gb, region):
+        """Monthly price of the provisioned tier for one disk, or None."""
+        costs = self.price_many([family], [size_gb], [region])
+        return None if np.isnan(costs[0]) else float(costs[0])
+
+    def price_many(self, families, sizes_gb, regions):
+        """Monthly prices for parallel arrays of disk families, requested sizes and regions.
+
+        Each family is resolved with one searchsorted over its sorted tier sizes.
+        Disks larger than the biggest tier or in unpriced regions come back as NaN.
+        """
+        families = np.asarray(families, dtype=object)
+        sizes_gb = np.asarray(sizes_gb, dtype=np.float64)
+        columns = np.array([self.region_positions.get(region, -1) for region in regions], dtype=np.int64)
+        costs = np.full(len(sizes_gb), np.nan)
+
+        for family in set(families.tolist()):
+            table = self.families.get(family)
+            if not table:
+                continue
+            rows = np.flatnonzero(families == family)
+            tier = np.searchsorted(table["size_array"], sizes_gb[rows], side="left")
+            priced = (tier < len(table["sizes"])) & (columns[rows] >= 0)
+            rows, tier = rows[priced], tier[priced]
+            costs[rows] = table["prices"][tier, columns[rows]]
+        return costs
+
+# Loaded on first use and shared by every caller in the process
+_disk_tiers = None
+
+def load_disk_tiers(refresh=False):
+    """Returns the shared DiskTierTable, fetching the disk payload only once."""
+    global _disk_tiers
+    if _disk_tiers is None or refresh:
+        data = fetch_data(DISK_PRICING_URL)
+        if not data or "offers" not in data:
+            print("Error: Could not retrieve disk pricing.")
+            return None
+        _disk_tiers = DiskTierTable(data)
+    return _disk_tiers
+
+def get_disk_cost(region, disk_type, disk_size):
+    """Retrieve the monthly cost of the Managed Disk tier that fits disk_size"""
+    table = load_disk_tiers()
+    cost = table.price(table.family_of(disk_type), disk_size, region) if table else None
+    if cost is None:
+        print("Disk type not found or pricing unavailable.")
+        return 0
+    return cost
@@ -0,0 +1,147 @@
+import argparse
+import json
+
+from api_handler import VM_PRICING_URL, DISK_PRICING_URL, BANDWIDTH_PRICING_URL, STORAGE_PRICING_URL, fetch_many
+from bandwidth import INTERNET_EGRESS, BandwidthPricing
+from disk_tiers import DiskTierTable
+from price_index import HOURS_PER_MONTH, build_vm_index, build_storage_index, resolve_storage_offer, storage_monthly_cost
+
+def load_manifest(path):
+    """Loads a JSON or YAML manifest and returns its list of components."""
+    with open(path) as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                print("[ERROR] PyYAML is required for YAML manifests (pip install pyyaml).")
+                return []
+            manifest = yaml.safe_load(f)
+        else:
+            manifest = json.load(f)
+
+    if isinstance(manifest, dict):
+        return manifest.get("components", [])
+    return manifest or []
+
+def payload_url(component):
+    """Returns the calculator payload URL a component is priced from."""
+    kind = component.get("type")
+    if kind == "vm":
+        return VM_PRICING_URL.format(region=component["region"])
+    if kind == "disk":
+        return DISK_PRICING_URL
+    if kind == "bandwidth":
+        return BANDWIDTH_PRICING_URL
+    if kind == "storage":
+        return STORAGE_PRICING_URL
+    return None
+
+def plan_payloads(components):
+    """Works out the distinct payloads a manifest needs, as {url: (component type, region)}."""
+    plan = {}
+    for component in components:
+        url = payload_url(component)
+        if url is None:
+            print(f"[WARNING] Unknown component type '{component.get('type')}'. Skipping.")
+            continue
+        plan.setdefault(url, (component["type"], component.get("region")))
+    return plan
+
+def build_indexes(payloads, plan):
+    """Builds one shared index per fetched payload."""
+    indexes = {}
+    for url, payload in payloads.items():
+        if not payload or "offers" not in payload:
+            print(f"[ERROR] Could not retrieve pricing from {url}")
+            continue
+        kind, region = plan[url]
+        if kind == "vm":
+            indexes[url] = build_vm_index(payload, region)
+        elif kind == "disk":
+            indexes[url] = DiskTierTable(payload)
+        elif kind == "bandwidth":
+            indexes[url] = BandwidthPricing(payload)
+        elif kind == "storage":
+            indexes[url] = build_storage_index(payload)
+    return indexes
+
+def price_component(component, index):
+    """Prices one manifest line item against its payload index. Returns the monthly cost or None."""
+    kind = component["type"]
+    region = component["region"]
+    quantity = component.get("quantity", 1)
+
+    if kind == "vm":
+        price_per_hour = index.get(component["sku"])
+        if price_per_hour is None:
+            return None
+        return price_per_hour * component.get("hours", HOURS_PER_MONTH) * quantity
+
+    if kind == "disk":
+        disk_type = component["disk_type"]
+        size_gb = component.get("size_gb") or index.offer_sizes.get(disk_type, 0)
+        price = index.price(index.family_of(disk_type), size_gb, region)
+        return None if price is None else price * quantity
+
+    if kind == "bandwidth":
+        cost = index.cost(component.get("family", INTERNET_EGRESS), region, component.get("gb", 0))
+        return None if cost is None else float(cost) * quantity
+
+    if kind == "storage":
+        offer_key = resolve_storage_offer(index, component["account_type"], component["storage_type"],
+                                          component["access_tier"], component["redundancy"],
+                                          component.get("file_structure", "flat"))
+        if not offer_key:
+            return None
+        cost = storage_monthly_cost(index[offer_key], region, component.get("capacity_gb", 0))
+        return None if cost is None else cost * quantity
+
+    return None
+
+def estimate(components, max_workers=8):
+    """Fetches every distinct payload once (concurrently) and prices all components."""
+    plan = plan_payloads(components)
+    indexes = build_indexes(fetch_many(plan, max_workers=max_workers), plan)
+
+    lines = []
+    for component in components:
+        index = indexes.get(payload_url(component))
+        cost = price_component(component, index) if index is not None else None
+        if cost is None:
+            print(f"[WARNING] No pricing found for {component}")
+        lines.append({**component, "monthly_cost": cost})
+    return lines
+
+def print_summary(lines):
+    """Prints the priced bill of materials."""
+    print("\n===== Estimated Monthly Cost =====")
+    total_cost = 0
+    for line in lines:
+        name = line.get("name") or line.get("sku") or line.get("disk_type") or line["type"]
+        cost = line["monthly_cost"]
+        cost_text = f"${cost:,.2f}" if cost is not None else "unavailable"
+        print(f"{line['type']:<10} {line['region']:<16} {name:<32} {cost_text}")
+        total_cost += cost or 0
+    print(f"\nTotal Cost   : ${total_cost:,.2f}")
+    print("===================================")
+
+def main():
+    parser = argparse.ArgumentParser(description="Estimate the monthly cost of a deployment manifest.")
+    parser.add_argument("manifest", help="JSON or YAML manifest with a list of components")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent payload fetches")
+    parser.add_argument("--json", action="store_true", help="Print priced line items as JSON")
+    args = parser.parse_args()
+
+    components = load_manifest(args.manifest)
+    if not components:
+        print("No components found in manifest.")
+        return
+
+    lines = estimate(components, max_workers=args.workers)
+    if args.json:
+        print(json.dumps(lines, indent=2))
+    else:
+        print_summary(lines)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import argparse
+import csv
+import json
+import math
+import sys
+from itertools import islice
+
+import numpy as np
+
+from bandwidth import INTERNET_EGRESS, load_bandwidth_pricing
+from disk_tiers import load_disk_tiers
+from price_index import HOURS_PER_MONTH, load_vm_prices
+
+CHUNK_ROWS = 50000
+COST_FIELDS = ("vm_cost", "disk_cost", "egress_cost", "total_cost")
+
+def field_value(row, field, default):
+    """Numeric value of a row field; default only when the field is missing or blank, so 0 stays 0."""
+    value = row.get(field)
+    if value is None or value == "":
+        return float(default)
+    return float(value)
+
+NUMERIC_FIELDS = ("hours", "quantity", "disk_size_gb", "egress_gb")
+
+def row_error(row):
+    """Why a row cannot be priced, or None. Such rows are written out unpriced instead of stopping the run."""
+    if not row.get("region") or not row.get("sku"):
+        return row.get("error") or "Missing 'region' or 'sku'"
+    for field in NUMERIC_FIELDS:
+        try:
+            value = field_value(row, field, 0)
+        except (TypeError, ValueError):
+            return f"'{field}' must be a number"
+        if not math.isfinite(value):
+            return f"'{field}' must be a finite number"
+    return None
+
+class FleetPricer:
+    """Prices inventory chunks against VM, disk and bandwidth indexes that are loaded once."""
+
+    def __init__(self, max_workers=16):
+        self.max_workers = max_workers
+        self.vm_prices = {}
+        self.loaded_regions = set()
+        self.disk_tiers = load_disk_tiers()
+        self.bandwidth = load_bandwidth_pricing()
+
+    def load_regions(self, regions):
+        """Fetches VM payloads for regions not seen yet, concurrently."""
+        missing = set(regions) - self.loaded_regions
+        if not missing:
+            return
+        self.vm_prices.update(load_vm_prices(missing, self.max_workers))
+        self.loaded_regions |= missing
+
+    def price_chunk(self, rows):
+        """Adds vm_cost, disk_cost, egress_cost, total_cost and error to every row of a chunk.
+
+        Rows that cannot be parsed get no costs and an error message; the rest are priced.
+        """
+        errors = [row_error(row) for row in rows]
+        for row, error in zip(rows, errors):
+            row["error"] = error
+            if error is not None:
+                row.update(dict.fromkeys(COST_FIELDS))
+        valid_rows = [row for row, error in zip(rows, errors) if error is None]
+        if valid_rows:
+            self.price_rows(valid_rows)
+        return rows
+
+    def price_rows(self, rows):
+        """Adds the cost fields to rows that passed row_error."""
+        regions = [row["region"] for row in rows]
+        self.load_regions(regions)
+
+        hours = np.array([field_value(row, "hours", HOURS_PER_MONTH) for row in rows])
+        quantities = np.array([field_value(row, "quantity", 1) for row in rows])
+        hourly = np.array([self.vm_prices.get((row["region"], row["sku"]), np.nan) for row in rows])
+        vm_cost = hourly * hours * quantities
+
+        disk_cost = np.zeros(len(rows))
+        has_disk = np.array([bool(row.get("disk_type")) for row in rows])
+        if self.disk_tiers and has_disk.any():
+            disk_rows = [row for row in rows if row.get("disk_type")]
+            families = [self.disk_tiers.family_of(row["disk_type"]) for row in disk_rows]
+            sizes = [float(row.get("disk_size_gb") or self.disk_tiers.offer_sizes.get(row["disk_type"], 0))
+                     for row in disk_rows]
+            disk_cost[has_disk] = self.disk_tiers.price_many(families, sizes, [row["region"] for row in disk_rows])
+            disk_cost[has_disk] *= quantities[has_disk]
+
+        egress_gb = np.array([field_value(row, "egress_gb", 0) for row in rows])
+        egress_cost = np.zeros(len(rows))
+        if self.bandwidth and egress_gb.any():
+            egress_cost = np.where(egress_gb > 0, self.bandwidth.cost_many(INTERNET_EGRESS, regions, egress_gb), 0)
+
+        total_cost = vm_cost + disk_cost + egress_cost
+        costs = zip(vm_cost.tolist(), disk_cost.tolist(), egress_cost.tolist(), total_cost.tolist())
+        for row, values in zip(rows, costs):
+            row.update({field: None if value != value else round(value, 6)  # NaN means unpriced
+                        for field, value in zip(COST_FIELDS, values)})
+
+def read_rows(path, input_format):
+    """Yields inventory rows as dicts from a CSV or NDJSON file, one at a time."""
+    with open(path, newline="") as f:
+        if input_format == "csv":
+            yield from csv.DictReader(f)
+        else:
+            for number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    row = {"error": f"Invalid JSON on line {number}: {e}"}
+                yield row if isinstance(row, dict) else {"error": f"Line {number} is not a JSON object"}
+
+def chunked(rows, size):
+    """Groups an iterator of rows into lists of at most size rows."""
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+def detect_format(path, explicit):
+    """Uses the explicit format if given, otherwise the file extension."""
+    if explicit:
+        return explicit
+    return "ndjson" if path.endswith((".ndjson", ".jsonl")) else "csv"
+
+def price_inventory(input_path, output_path, input_format=None, output_format=None, chunk_rows=CHUNK_ROWS):
+    """Streams an inventory through the pricer in chunks and writes the priced file."""
+    input_format = detect_format(input_path, input_format)
+    output_format = detect_format(output_path, output_format)
+    pricer = FleetPricer()
+    totals = dict.fromkeys(COST_FIELDS, 0.0)
+    row_count = 0
+    error_count = 0
+    writer = None
+
+    with open(output_path, "w", newline="") as out:
+        for chunk in chunked(read_rows(input_path, input_format), chunk_rows):
+            pricer.price_chunk(chunk)
+            if output_format == "csv":
+                if writer is None:
+                    # Input columns as they appear in the chunk, then the fields added here
+                    added = COST_FIELDS + ("error",)
+                    fieldnames = [field for field in dict.fromkeys(field for row in chunk for field in row)
+                                  if field not in added] + list(added)
+                    writer = csv.DictWriter(out, fieldnames=fieldnames, extrasaction="ignore")
+                    writer.writeheader()
+                writer.writerows(chunk)
+            else:
+                out.write("".join(json.dumps(row) + "\n" for row in chunk))
+
+            for row in chunk:
+                for field in COST_FIELDS:
+                    totals[field] += row[field] or 0
+            row_count += len(chunk)
+            error_count += sum(1 for row in chunk if row["error"])
+            print(f"[INFO] Priced {row_count:,} rows ({error_count:,} rejected)", file=sys.stderr)
+
+    return row_count, totals
+
+def main():
+    parser = argparse.ArgumentParser(description="Price a VM fleet inventory (CSV or NDJSON) without prompts.")
+    parser.add_argument("inventory", help="Rows with region, sku, hours, quantity, disk_type, disk_size_gb, egress_gb")
+    parser.add_argument("output", help="Priced output file (.csv or .ndjson)")
+    parser.add_argument("--input-format", choices=("csv", "ndjson"))
+    parser.add_argument("--output-format", choices=("csv", "ndjson"))
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    row_count, totals = price_inventory(args.inventory, args.output, args.input_format,
+                                        args.output_format, args.chunk_rows)
+
+    print("\n===== Fleet Monthly Cost =====")
+    print(f"Rows         : {row_count:,}")
+    print(f"VM Cost      : ${totals['vm_cost']:,.2f}")
+    print(f"Disk Cost    : ${totals['disk_cost']:,.2f}")
+    print(f"Egress Cost  : ${totals['egress_cost']:,.2f}")
+    print(f"Total Cost   : ${totals['total_cost']:,.2f}")
+    print("===================================")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+import numpy as np
+
+# Prices are stored as int64 counts of one millionth of a currency unit
+MICROS_PER_UNIT = 1_000_000
+
+# Output rounding policy: decimal places kept for each kind of figure
+ROUNDING = {
+    "unit_price": 6,   # Retail unit prices are published with up to 6 decimals
+    "line_total": 2,   # Invoice lines are rounded to cents
+    "total": 2,
+}
+
+def to_micros(prices):
+    """Converts prices to an int64 array of micro-units.
+
+    Numeric input is scaled and rounded to the nearest micro-unit in one vectorized
+    step, so 0.1 becomes exactly 100000. Strings and Decimals go through Decimal.
+    Both paths round half up (away from zero), so 0.0000025 and "0.0000025" agree.
+    """
+    prices = np.asarray(prices)
+    if prices.dtype.kind in "biuf":
+        # Trimming float noise first keeps 2.4999999999999996 (from 0.0000025) a half
+        scaled = np.round(prices.astype(np.float64) * MICROS_PER_UNIT, 6)
+        return (np.sign(scaled) * np.floor(np.abs(scaled) + 0.5)).astype(np.int64)
+
+    micros = [int((Decimal(str(price)) * MICROS_PER_UNIT).to_integral_value(ROUND_HALF_UP)) for price in prices.ravel()]
+    return np.array(micros, dtype=np.int64).reshape(prices.shape)
+
+def divide_round(values, divisor):
+    """Integer division rounding half up (away from zero, like ROUND_HALF_UP), elementwise."""
+    values = np.asarray(values, dtype=np.int64)
+    return np.sign(values) * ((np.abs(values) + divisor // 2) // divisor)
+
+def round_micros(micros, places):
+    """Rounds micro-unit amounts half up to the given number of decimal places, staying in int64."""
+    step = 10 ** (6 - places)
+    return divide_round(micros, step) * step
+
+def multiply(price_micros, quantities):
+    """Micro-unit amounts for price x quantity, exact for quantities with up to 6 decimals.
+
+    The quantity is split into whole units and a micro-unit fraction so neither
+    partial product can overflow int64 for any realistic bill.
+    """
+    price_micros = np.asarray(price_micros, dtype=np.int64)
+    quantity_micros = to_micros(quantities)
+    # Split the magnitude so the fraction's rounding is symmetric for negative quantities too
+    whole, fraction = np.divmod(np.abs(quantity_micros), MICROS_PER_UNIT)
+    return np.sign(quantity_micros) * (price_micros * whole + divide_round(price_micros * fraction, MICROS_PER_UNIT))
+
+def line_totals(price_micros, quantities, kind="line_total"):
+    """Invoice line totals: price x quantity, each line rounded per the output policy."""
+    return round_micros(multiply(price_micros, quantities), ROUNDING[kind])
+
+def total(line_micros):
+    """Exact sum of micro-unit amounts, as a Python int."""
+    return int(np.sum(np.asarray(line_micros, dtype=np.int64)))
+
+def to_decimal(micros, kind="total"):
+    """Converts a micro-unit amount to a Decimal at the precision of the given output kind."""
+    places = ROUNDING[kind]
+    return (Decimal(int(micros)) / MICROS_PER_UNIT).quantize(Decimal(1).scaleb(-places), rounding=ROUND_HALF_UP)
+
+def format_amount(micros, kind="total"):
+    """Formats a micro-unit amount for display at the precision of the given output kind."""
+    return f"{to_decimal(micros, kind):,}"
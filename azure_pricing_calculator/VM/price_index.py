@@ -0,0 +1,67 @@
+import sys
+
+from api_handler import VM_PRICING_URL, fetch_many
+
+HOURS_PER_MONTH = 730
+
+def build_vm_index(payload, region):
+    """Map every VM SKU in a v4 calculator payload to its hourly price in region."""
+    index = {}
+    for sku, offer in payload.get("offers", {}).items():
+        price = offer.get("prices", {}).get("perhour", {}).get(region, {}).get("value")
+        if price is not None:
+            index[sku] = float(price)
+    return index
+
+def load_vm_payloads(regions, max_workers=16):
+    """Fetches the VM payload of every region concurrently and returns {region: payload}."""
+    urls = {VM_PRICING_URL.format(region=region): region for region in regions}
+    payloads = {}
+    for url, payload in fetch_many(urls, max_workers=max_workers).items():
+        if not payload or "offers" not in payload:
+            print(f"[WARNING] No VM pricing for region {urls[url]}", file=sys.stderr)
+            continue
+        payloads[urls[url]] = payload
+    return payloads
+
+def load_vm_prices(regions, max_workers=16):
+    """Fetches the VM payload of every region and returns {(region, sku): hourly price}."""
+    prices = {}
+    for region, payload in load_vm_payloads(regions, max_workers).items():
+        for sku, price in build_vm_index(payload, region).items():
+            prices[(region, sku)] = price
+    return prices
+
+def build_storage_index(payload):
+    """Keep the storage offers keyed by offer name, without operation offers."""
+    return {key: offer for key, offer in payload.get("offers", {}).items() if "operation" not in key.lower()}
+
+def resolve_storage_offer(storage_index, account_type, storage_type, access_tier, redundancy, file_structure):
+    """Resolves a storage configuration to an offer key (exact match first, then partial)."""
+    expected_key = f"{account_type}-{storage_type}-{file_structure}-{access_tier}-{redundancy}"
+    if expected_key in storage_index:
+        return expected_key
+
+    alternative_key = f"{account_type}-{storage_type}-{access_tier}-{redundancy}"
+    partial_match = None
+    for key in storage_index:
+        if alternative_key in key:
+            partial_match = key
+    return partial_match
+
+def storage_monthly_cost(offer, region, capacity_gb):
+    """Monthly storage cost for capacity_gb, using graduated tiers when the offer has them."""
+    tiers = offer.get("graduatedPrices", {}).get("pergb", {}).get(region, {}).get("prices", [])
+    if not tiers:
+        price = offer.get("prices", {}).get("pergb", {}).get(region, {}).get("value")
+        return None if price is None else capacity_gb * price
+
+    total_cost = 0
+    remaining_gb = capacity_gb
+    for tier in tiers:
+        if remaining_gb <= 0:
+            break
+        usage = min(remaining_gb, tier["limit"])
+        total_cost += usage * tier["price"]["value"]
+        remaining_gb -= usage
+    return total_cost
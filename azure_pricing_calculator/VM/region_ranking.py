@@ -0,0 +1,118 @@
+import argparse
+
+import numpy as np
+
+from api_handler import STORAGE_PRICING_URL, get_regions, fetch_data
+from price_index import (HOURS_PER_MONTH, load_vm_prices, build_storage_index, resolve_storage_offer,
+                         storage_monthly_cost)
+
+class RegionRanking:
+    """Per-key monthly price vectors across regions with a precomputed cheapest-first order."""
+
+    def __init__(self, prices):
+        """prices maps each key (VM SKU or storage offer) to {region: monthly cost}."""
+        self.keys = sorted(prices)
+        self.regions = np.array(sorted({region for costs in prices.values() for region in costs}), dtype=object)
+        self.key_positions = {key: row for row, key in enumerate(self.keys)}
+        region_positions = {region: col for col, region in enumerate(self.regions)}
+
+        self.matrix = np.full((len(self.keys), len(self.regions)), np.nan)
+        for row, key in enumerate(self.keys):
+            for region, cost in prices[key].items():
+                self.matrix[row, region_positions[region]] = cost
+
+        # NaN (region without a price) sorts last, so each row's priced regions form a prefix
+        self.order = np.argsort(self.matrix, axis=1, kind="stable")
+        self.sorted_costs = np.take_along_axis(self.matrix, self.order, axis=1)
+        self.priced_counts = np.count_nonzero(~np.isnan(self.matrix), axis=1)
+
+    def rank(self, key, top=None):
+        """Returns [(region, monthly cost, spread from cheapest)] sorted cheapest first."""
+        row = self.key_positions.get(key)
+        if row is None:
+            return []
+
+        count = self.priced_counts[row] if top is None else min(top, self.priced_counts[row])
+        costs = self.sorted_costs[row, :count]
+        regions = self.regions[self.order[row, :count]]
+        spreads = costs - costs[0] if count else costs
+        return list(zip(regions.tolist(), costs.tolist(), spreads.tolist()))
+
+    def cheapest(self, key):
+        """Returns (region, monthly cost) of the cheapest region for key, or None."""
+        ranking = self.rank(key, top=1)
+        return ranking[0][:2] if ranking else None
+
+def list_region_slugs():
+    """Returns the region slugs known to the calculator."""
+    regions = get_regions()
+    if not regions:
+        return []
+    return [item.get("slug") or item.get("name") for item in regions.get("items", [])]
+
+def load_vm_ranking(regions, max_workers=16):
+    """Fetches the VM payload of every region concurrently and builds a SKU x region ranking."""
+    prices = {}
+    for (region, sku), price_per_hour in load_vm_prices(regions, max_workers).items():
+        prices.setdefault(sku, {})[region] = price_per_hour * HOURS_PER_MONTH
+    return RegionRanking(prices)
+
+def load_storage_ranking(capacity_gb, payload=None):
+    """Builds a storage offer x region ranking for a fixed monthly capacity."""
+    payload = payload or fetch_data(STORAGE_PRICING_URL)
+    if not payload or "offers" not in payload:
+        print("[ERROR] Could not retrieve storage pricing.")
+        return RegionRanking({})
+
+    prices = {}
+    for key, offer in build_storage_index(payload).items():
+        regions = set(offer.get("prices", {}).get("pergb", {})) | set(offer.get("graduatedPrices", {}).get("pergb", {}))
+        costs = {region: storage_monthly_cost(offer, region, capacity_gb) for region in regions}
+        prices[key] = {region: cost for region, cost in costs.items() if cost is not None}
+    return RegionRanking(prices)
+
+def print_ranking(key, ranking):
+    """Prints a region ranking table."""
+    if not ranking:
+        print(f"No regional pricing found for {key}.")
+        return
+
+    print(f"\n===== Regions ranked by monthly cost: {key} =====")
+    for position, (region, cost, spread) in enumerate(ranking, start=1):
+        print(f"{position:>3}. {region:<24} ${cost:>12,.2f}   (+${spread:,.2f})")
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank regions by monthly cost for a VM SKU or storage configuration.")
+    subparsers = parser.add_subparsers(dest="kind", required=True)
+
+    vm_parser = subparsers.add_parser("vm", help="Rank regions for a VM SKU")
+    vm_parser.add_argument("sku")
+    vm_parser.add_argument("--regions", nargs="+", help="Region slugs (default: all calculator regions)")
+    vm_parser.add_argument("--top", type=int)
+
+    storage_parser = subparsers.add_parser("storage", help="Rank regions for a storage configuration")
+    storage_parser.add_argument("--account-type", required=True)
+    storage_parser.add_argument("--storage-type", required=True)
+    storage_parser.add_argument("--access-tier", required=True)
+    storage_parser.add_argument("--redundancy", required=True)
+    storage_parser.add_argument("--file-structure", default="flat")
+    storage_parser.add_argument("--capacity-gb", type=float, required=True)
+    storage_parser.add_argument("--top", type=int)
+    args = parser.parse_args()
+
+    if args.kind == "vm":
+        ranking = load_vm_ranking(args.regions or list_region_slugs())
+        print_ranking(args.sku, ranking.rank(args.sku, top=args.top))
+        return
+
+    payload = fetch_data(STORAGE_PRICING_URL)
+    ranking = load_storage_ranking(args.capacity_gb, payload)
+    offer_key = resolve_storage_offer(build_storage_index(payload or {}), args.account_type, args.storage_type,
+                                      args.access_tier, args.redundancy, args.file_structure)
+    if not offer_key:
+        print("[ERROR] No valid storage offer found for that configuration.")
+        return
+    print_ranking(offer_key, ranking.rank(offer_key, top=args.top))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import argparse
+import json
+
+import numpy as np
+
+from price_index import HOURS_PER_MONTH, load_vm_payloads
+
+# Capability attributes in the v4 VM payload, keyed by the search argument that constrains them
+ATTRIBUTES = {
+    "min_vcpus": "cores",
+    "min_memory_gb": "ram",
+    "min_disk_gb": "diskSize",
+}
+
+class SkuIndex:
+    """Sorted capability columns for the priced VM SKUs of one region."""
+
+    def __init__(self, payload, region):
+        self.region = region
+        skus, prices, columns = [], [], {attr: [] for attr in ATTRIBUTES.values()}
+        for sku, offer in payload.get("offers", {}).items():
+            price = offer.get("prices", {}).get("perhour", {}).get(region, {}).get("value")
+            if price is None:
+                continue
+            skus.append(sku)
+            prices.append(float(price))
+            for attr in columns:
+                columns[attr].append(float(offer.get(attr) or 0))
+
+        self.skus = np.array(skus, dtype=object)
+        self.prices = np.array(prices, dtype=np.float64)
+        self.columns = {attr: np.array(values, dtype=np.float64) for attr, values in columns.items()}
+        self.orders = {attr: np.argsort(values, kind="stable") for attr, values in self.columns.items()}
+        self.sorted_columns = {attr: self.columns[attr][order] for attr, order in self.orders.items()}
+
+    def candidates(self, minimums):
+        """Offer positions satisfying every minimum, pruned through the most selective sorted column."""
+        bounds = []
+        for argument, minimum in minimums.items():
+            attr = ATTRIBUTES[argument]
+            start = np.searchsorted(self.sorted_columns[attr], minimum, side="left")
+            bounds.append((len(self.skus) - start, attr, start, minimum))
+
+        if not bounds:
+            return np.arange(len(self.skus))
+
+        bounds.sort(key=lambda bound: bound[0])
+        _, attr, start, _ = bounds[0]
+        positions = self.orders[attr][start:]
+        for _, attr, _, minimum in bounds[1:]:
+            positions = positions[self.columns[attr][positions] >= minimum]
+        return positions
+
+    def search(self, k=5, **minimums):
+        """Returns the k cheapest SKUs meeting the given minimums (min_vcpus, min_memory_gb, min_disk_gb)."""
+        minimums = {argument: value for argument, value in minimums.items() if value}
+        positions = self.candidates(minimums)
+        if len(positions) > k:
+            cheapest = np.argpartition(self.prices[positions], k - 1)[:k]
+            positions = positions[cheapest]
+        positions = positions[np.argsort(self.prices[positions], kind="stable")]
+
+        return [{
+            "region": self.region,
+            "sku": self.skus[pos],
+            "vcpus": self.columns["cores"][pos],
+            "memory_gb": self.columns["ram"][pos],
+            "disk_gb": self.columns["diskSize"][pos],
+            "hourly_price": self.prices[pos],
+            "monthly_cost": self.prices[pos] * HOURS_PER_MONTH,
+        } for pos in positions.tolist()]
+
+def load_sku_indexes(regions, max_workers=16):
+    """Fetches each region's VM payload concurrently and builds its SkuIndex."""
+    return {region: SkuIndex(payload, region) for region, payload in load_vm_payloads(regions, max_workers).items()}
+
+def search_regions(indexes, k=5, **minimums):
+    """Runs one constraint search in every loaded region."""
+    return {region: index.search(k, **minimums) for region, index in indexes.items()}
+
+def search_workloads(indexes, workloads, k=5):
+    """Runs the constraint search for many workloads against the same loaded indexes."""
+    results = []
+    for workload in workloads:
+        minimums = {argument: workload.get(argument) for argument in ATTRIBUTES}
+        results.append({"workload": workload.get("name"), "matches": search_regions(indexes, k, **minimums)})
+    return results
+
+def print_matches(matches):
+    """Prints the cheapest matching SKUs per region."""
+    for region, rows in matches.items():
+        print(f"\n===== {region} =====")
+        if not rows:
+            print("No SKU meets the requested constraints.")
+        for row in rows:
+            print(f"- {row['sku']:<36} {row['vcpus']:>4g} vCPU {row['memory_gb']:>7g} GB RAM "
+                  f"{row['disk_gb']:>7g} GB disk   ${row['monthly_cost']:,.2f}/month")
+
+def main():
+    parser = argparse.ArgumentParser(description="Find the cheapest VM SKUs meeting vCPU/RAM/disk constraints.")
+    parser.add_argument("--regions", nargs="+", required=True, help="Region slugs to search")
+    parser.add_argument("--vcpus", type=float, help="Minimum vCPU count")
+    parser.add_argument("--memory-gb", type=float, help="Minimum memory in GB")
+    parser.add_argument("--disk-gb", type=float, help="Minimum temporary disk in GB")
+    parser.add_argument("--workloads", help="JSON file of workloads with min_vcpus/min_memory_gb/min_disk_gb")
+    parser.add_argument("-k", type=int, default=5, help="Number of SKUs to return per region")
+    args = parser.parse_args()
+
+    indexes = load_sku_indexes(args.regions)
+    if args.workloads:
+        with open(args.workloads) as f:
+            print(json.dumps(search_workloads(indexes, json.load(f), k=args.k), indent=2))
+        return
+
+    print_matches(search_regions(indexes, args.k, min_vcpus=args.vcpus,
+                                 min_memory_gb=args.memory_gb, min_disk_gb=args.disk_gb))
+
+if __name__ == "__main__":
+    main()
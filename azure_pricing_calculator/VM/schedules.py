@@ -0,0 +1,122 @@
+import argparse
+import calendar
+import json
+
+import numpy as np
+
+from price_index import HOURS_PER_MONTH, load_vm_prices
+
+MAX_HOURS = 31 * 24
+
+# Number of set bits in every possible byte
+POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint16)
+
+def month_weekdays(year, month):
+    """Weekday (0 = Monday) of every hour slot in the month, padded to MAX_HOURS with -1."""
+    days = calendar.monthrange(year, month)[1]
+    first_weekday = calendar.weekday(year, month, 1)
+    weekdays = np.full(MAX_HOURS, -1)
+    weekdays[:days * 24] = np.repeat((first_weekday + np.arange(days)) % 7, 24)
+    return weekdays
+
+def week_mask(days=range(7), start_hour=0, end_hour=24):
+    """7 x 24 boolean mask of the hours a VM runs in a typical week."""
+    mask = np.zeros((7, 24), dtype=bool)
+    mask[list(days), start_hour:end_hour] = True
+    return mask
+
+def month_bitmap(year, month, mask):
+    """Packs a weekly 7 x 24 mask into the month's hour bitmap (MAX_HOURS bits, as uint8 bytes)."""
+    weekdays = month_weekdays(year, month)
+    hours = np.tile(np.arange(24), 31)
+    running = (weekdays >= 0) & mask[np.maximum(weekdays, 0), hours]
+    return np.packbits(running)
+
+def schedule_masks(definition):
+    """Turns a schedule definition into a list of weekly masks, one per instance layer.
+
+    Supported types: "always", "business_hours" (weekdays, start-end), "weekends_off",
+    and "autoscale" with a list of layers, each a schedule definition of its own.
+    """
+    kind = definition.get("type", "always")
+    if kind == "always":
+        return [week_mask()]
+    if kind == "business_hours":
+        return [week_mask(definition.get("days", range(5)), definition.get("start", 8), definition.get("end", 18))]
+    if kind == "weekends_off":
+        return [week_mask(range(5))]
+    if kind == "autoscale":
+        return [mask for layer in definition.get("layers", []) for mask in schedule_masks(layer)]
+    raise ValueError(f"Unknown schedule type '{kind}'")
+
+def compile_schedules(definitions, year, month):
+    """Compiles named schedules to bitmaps: ({name: row}, uint8 array (layers, bytes), layer -> row)."""
+    names, layers, owners = {}, [], []
+    for name, definition in definitions.items():
+        names[name] = len(names)
+        for mask in schedule_masks(definition):
+            layers.append(month_bitmap(year, month, mask))
+            owners.append(names[name])
+    bitmaps = np.array(layers, dtype=np.uint8).reshape(len(layers), MAX_HOURS // 8)
+    return names, bitmaps, np.array(owners, dtype=np.int64)
+
+def billable_hours(bitmaps, owners, schedule_count):
+    """Instance-hours per schedule: popcount of each layer, summed per schedule."""
+    layer_hours = POPCOUNT[bitmaps].sum(axis=1)
+    return np.bincount(owners, weights=layer_hours, minlength=schedule_count)
+
+def cost_fleet(vms, schedules, year, month, price_index):
+    """Prices every VM for the month from its schedule's billable hours.
+
+    price_index maps (region, sku) to the hourly price. Returns arrays of
+    billable hours, scheduled cost and the always-on 730-hour cost per VM.
+    """
+    names, bitmaps, owners = compile_schedules(schedules, year, month)
+    hours_by_schedule = billable_hours(bitmaps, owners, len(names))
+
+    # VMs without a known schedule run every hour of the month
+    schedule_rows = np.array([names.get(vm.get("schedule"), -1) for vm in vms], dtype=np.int64)
+    always_on = calendar.monthrange(year, month)[1] * 24
+    if len(names) == 0:
+        hours = np.full(len(vms), always_on, dtype=np.float64)  # no schedules to look up
+    else:
+        hours = np.where(schedule_rows >= 0, hours_by_schedule[np.maximum(schedule_rows, 0)], always_on)
+
+    prices = np.array([price_index.get((vm["region"], vm["sku"]), np.nan) for vm in vms], dtype=np.float64)
+    quantities = np.array([vm.get("quantity", 1) for vm in vms], dtype=np.float64)
+    return {
+        "hours": hours,
+        "cost": prices * hours * quantities,
+        "flat_730_cost": prices * HOURS_PER_MONTH * quantities,
+    }
+
+def load_price_index(vms, max_workers=16):
+    """Fetches the VM payload of every region in the fleet and returns {(region, sku): hourly price}."""
+    return load_vm_prices({vm["region"] for vm in vms}, max_workers)
+
+def main():
+    parser = argparse.ArgumentParser(description="Schedule-aware monthly VM costing.")
+    parser.add_argument("fleet", help='JSON file with "schedules" and "vms" (region, sku, schedule, quantity)')
+    parser.add_argument("--month", required=True, help="Billing month as YYYY-MM")
+    args = parser.parse_args()
+
+    with open(args.fleet) as f:
+        fleet = json.load(f)
+    year, month = (int(part) for part in args.month.split("-"))
+    vms = fleet.get("vms", [])
+
+    result = cost_fleet(vms, fleet.get("schedules", {}), year, month, load_price_index(vms))
+
+    print("\n===== Scheduled VM Cost =====")
+    for vm, hours, cost, flat in zip(vms, result["hours"], result["cost"], result["flat_730_cost"]):
+        print(f"{vm.get('name', vm['sku']):<32} {hours:>6.0f} h   ${cost:>12,.2f}   (730 h: ${flat:,.2f})")
+
+    total = np.nansum(result["cost"])
+    flat_total = np.nansum(result["flat_730_cost"])
+    print(f"\nTotal Cost   : ${total:,.2f}")
+    print(f"730-hour Cost: ${flat_total:,.2f}")
+    if flat_total:
+        print(f"Savings      : {1 - total / flat_total:.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+from money import to_micros
+
 def parse_price_data(data):
     """Parse the JSON response and extract the relevant pricing information."""
     if not data or "items" not in data:
@@ -11,6 +13,7 @@ def parse_price_data(data):
             'productName': item.get('productName', ''),
             'skuName': item.get('skuName', ''),
             'unitPrice': float(item.get('unitPrice', 0)),
+            'unitPriceMicros': int(to_micros(str(item.get('unitPrice', 0)))),
             'currencyCode': item.get('currencyCode', ''),
             'meterName': item.get('meterName', ''),
             'description': item.get('description', ''),
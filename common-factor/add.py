@@ -1,13 +1,41 @@
+import fcntl
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import tempfile
+import time
+
 import requests
-from flask import Flask, jsonify
+from flask import Flask, Response, request, stream_with_context
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip variants are always published
+    brotli = None
 
 API_URL = "https://prices.azure.com/api/retail/prices?$filter=serviceName eq 'Virtual Machines' and armRegionName eq 'eastus' and contains(productName, 'Windows') and currencyCode eq 'USD'"
 
+# The merged response is published once to shared memory, with precompressed variants,
+# in a directory named by its content hash; every worker maps the current one
+SNAPSHOT_DIR = os.path.join("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "azure-pricing")
+SNAPSHOT_LINK = os.path.join(SNAPSHOT_DIR, "azure-pricing.current")
+SNAPSHOT_TTL = 3600  # seconds
+REFRESH_RETRY_INTERVAL = 60  # seconds between re-crawl attempts after an upstream failure
+CHUNK_SIZE = 64 * 1024
+BODY_FILES = {"identity": "body.json", "gzip": "body.json.gz", "br": "body.json.br"}
+
 app = Flask(__name__)
 
-# Function to fetch all pages from the API and merge data
-def fetch_all_pages(api_url):
-    all_data = []
+# This worker's mapping of the snapshot: (version, {encoding: mmap})
+_snapshot = None
+# When this worker's last re-crawl failed, so a down upstream is not retried on every request
+_refresh_failed_at = None
+
+# Generator yielding each page's Items as soon as it arrives
+def iter_pages(api_url):
     next_page_url = api_url
 
     while next_page_url:
@@ -16,25 +44,174 @@ def fetch_all_pages(api_url):
             response = requests.get(next_page_url, timeout=10)
             response.raise_for_status()  # Raise an error for any bad HTTP responses
             data = response.json()
-            
-            if "Items" in data:
-                all_data.extend(data["Items"])
-            else:
-                print(f"No 'Items' found in response, data: {data}")  # Debug: Check the structure of response
-            
-            next_page_url = data.get("NextPageLink")  # Get the next page URL if available
-            print(f"Next page URL: {next_page_url}")  # Debug: Show the next page URL
-            
         except requests.exceptions.RequestException as e:
             print(f"Error fetching data: {e}")  # Debug: Print any errors during request
+            raise
+
+        if "Items" in data:
+            yield data["Items"]
+        else:
+            print(f"No 'Items' found in response, data: {data}")  # Debug: Check the structure of response
 
+        next_page_url = data.get("NextPageLink")  # Get the next page URL if available
+        print(f"Next page URL: {next_page_url}")  # Debug: Show the next page URL
+
+# Function to fetch all pages from the API and merge data
+def fetch_all_pages(api_url):
+    all_data = []
+    for items in iter_pages(api_url):
+        all_data.extend(items)
     return all_data
 
+def stream_ndjson(api_url):
+    """One JSON item per line, page by page; a final {"error": ...} line if the crawl fails."""
+    try:
+        for items in iter_pages(api_url):
+            yield "".join(json.dumps(item) + "\n" for item in items)
+    except requests.exceptions.RequestException as e:
+        yield json.dumps({"error": str(e)}) + "\n"
+
+def stream_json_array(api_url):
+    """The regular response shape, with data streamed as a chunked JSON array and the count at the end."""
+    total_records = 0
+    error = None
+    yield '{"data": ['
+    try:
+        for items in iter_pages(api_url):
+            if items:
+                yield ("," if total_records else "") + ",".join(json.dumps(item) for item in items)
+                total_records += len(items)
+    except requests.exceptions.RequestException as e:
+        error = str(e)
+    yield f'], "total_records": {total_records}'
+    yield f', "error": {json.dumps(error)}}}' if error else "}"
+
+def publish_snapshot(all_vm_prices):
+    """Write the serialized response and its compressed variants, then atomically swap them in.
+
+    The version is the body's content hash, so an unchanged re-crawl keeps its ETag.
+    """
+    body = json.dumps({"total_records": len(all_vm_prices), "data": all_vm_prices}).encode()
+    version = hashlib.sha1(body).hexdigest()
+    version_dir = os.path.join(SNAPSHOT_DIR, f"azure-pricing.{version}")
+    if not os.path.isdir(version_dir):
+        tmp_dir = tempfile.mkdtemp(dir=SNAPSHOT_DIR)
+        variants = {"identity": body, "gzip": gzip.compress(body, compresslevel=9)}
+        if brotli is not None:
+            variants["br"] = brotli.compress(body, quality=9)
+        for encoding, data in variants.items():
+            with open(os.path.join(tmp_dir, BODY_FILES[encoding]), "wb") as f:
+                f.write(data)
+        os.rename(tmp_dir, version_dir)
+
+    tmp_link = f"{SNAPSHOT_LINK}.{os.getpid()}"
+    os.symlink(os.path.basename(version_dir), tmp_link)
+    os.replace(tmp_link, SNAPSHOT_LINK)  # the new link's mtime marks the snapshot as fresh
+
+    for entry in os.listdir(SNAPSHOT_DIR):
+        path = os.path.join(SNAPSHOT_DIR, entry)
+        if entry.startswith("azure-pricing.") and path != version_dir and os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)  # workers still mapping it keep their pages
+
+def snapshot_is_fresh():
+    try:
+        return time.time() - os.lstat(SNAPSHOT_LINK).st_mtime < SNAPSHOT_TTL
+    except FileNotFoundError:
+        return False
+
+def refresh_snapshot():
+    """Re-crawl when the snapshot is missing or stale; the file lock lets only one worker do it.
+
+    Returns whether the crawl succeeded. On an upstream failure the current
+    snapshot, if any, stays published.
+    """
+    global _refresh_failed_at
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    with open(SNAPSHOT_LINK + ".lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            if not snapshot_is_fresh():  # another worker may have refreshed while we waited
+                publish_snapshot(fetch_all_pages(API_URL))
+            _refresh_failed_at = None
+            return True
+        except requests.exceptions.RequestException as e:
+            print(f"Snapshot refresh failed: {e}")
+            _refresh_failed_at = time.monotonic()
+            return False
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+def map_snapshot():
+    """(version, {encoding: read-only mmap}) of the current snapshot, remapped after a swap.
+
+    Returns None when there is no snapshot and the upstream crawl failed.
+    """
+    global _snapshot
+    if not snapshot_is_fresh():
+        retry_due = _refresh_failed_at is None or time.monotonic() - _refresh_failed_at >= REFRESH_RETRY_INTERVAL
+        if retry_due or not os.path.lexists(SNAPSHOT_LINK):
+            refresh_snapshot()
+    try:
+        version_dir = os.readlink(SNAPSHOT_LINK)
+    except FileNotFoundError:
+        return None
+    version = version_dir.rsplit(".", 1)[-1]
+    if _snapshot is None or _snapshot[0] != version:
+        bodies = {}
+        for encoding, name in BODY_FILES.items():
+            path = os.path.join(SNAPSHOT_DIR, version_dir, name)
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    bodies[encoding] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        _snapshot = (version, bodies)
+    return _snapshot
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+def preferred_encoding(accept_encoding, available):
+    """br, then gzip, then identity, among the variants the client accepts (q=0 excluded)."""
+    accepted = set()
+    for coding in (accept_encoding or "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(name.strip().lower())
+    return next((encoding for encoding in ("br", "gzip") if encoding in accepted and encoding in available),
+                "identity")
+
 # Route to fetch and return the merged results as a JSON response
 @app.route('/azure-pricing', methods=['GET'])
 def get_azure_pricing():
-    all_vm_prices = fetch_all_pages(API_URL)
-    return jsonify({"total_records": len(all_vm_prices), "data": all_vm_prices})
+    # ?stream=ndjson or ?stream=array crawls live and sends each page as it arrives
+    stream = request.args.get('stream')
+    if stream == 'ndjson':
+        return Response(stream_with_context(stream_ndjson(API_URL)), mimetype="application/x-ndjson")
+    if stream == 'array':
+        return Response(stream_with_context(stream_json_array(API_URL)), mimetype="application/json")
+    if stream:
+        return Response(json.dumps({"error": "stream must be 'ndjson' or 'array'"}), status=400,
+                        mimetype="application/json")
+
+    snapshot = map_snapshot()
+    if snapshot is None:
+        return Response(json.dumps({"error": "Could not fetch pricing data from the upstream API"}), status=502,
+                        mimetype="application/json")
+    version, bodies = snapshot
+    headers = {"ETag": f'"{version}"', "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("If-None-Match"), headers["ETag"]):
+        return Response(status=304, headers=headers)
+
+    encoding = preferred_encoding(request.headers.get("Accept-Encoding"), bodies)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    body = bodies[encoding]
+    headers["Content-Length"] = str(len(body))
+    chunks = (body[start:start + CHUNK_SIZE] for start in range(0, len(body), CHUNK_SIZE))
+    return Response(chunks, mimetype="application/json", headers=headers)
 
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,238 @@
+import argparse
+import heapq
+import json
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import product
+
+import requests
+
+BASE_URL = "https://prices.azure.com/api/retail/prices"
+MAX_CONCURRENCY = 8
+REQUESTS_PER_SECOND = 5
+MAX_RETRIES = 5
+# A query is answered from a broader crawl only when that crawl is known to take at most this many pages
+COVER_MAX_PAGES = 3
+
+def retry_after_seconds(value, default):
+    """Seconds to wait from a Retry-After header, in either its delay-seconds or HTTP-date form.
+
+    Falls back to default (the exponential backoff) when the header is missing or unparseable.
+    """
+    if not value:
+        return default
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return default
+
+class TokenBucket:
+    """Thread-safe token bucket: rate tokens per second, holding at most burst tokens."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available and takes it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_time = (1 - self.tokens) / self.rate
+            time.sleep(wait_time)
+
+def normalize_query(query):
+    """A query is a dict of field -> value equality filters; returns a hashable, ordered form."""
+    return tuple(sorted((field, str(value)) for field, value in query.items() if value is not None))
+
+def filter_string(query):
+    """OData $filter for a normalized query."""
+    return " and ".join(f"{field} eq '{value.replace(chr(39), chr(39) * 2)}'" for field, value in query)
+
+def query_url(query):
+    return f"{BASE_URL}?$filter={filter_string(query)}" if query else BASE_URL
+
+def matches(item, query):
+    """Whether a retail item satisfies every filter of a query (case-insensitive, like the API)."""
+    return all(str(item.get(field, "")).lower() == value.lower() for field, value in query)
+
+def plan_queries(queries, size_hints=None):
+    """Dedupes queries and maps every query to the crawl that answers it.
+
+    A query whose filters are a superset of another query's filters is a subset
+    of its results. It is answered locally from that query's items only when
+    size_hints (normalized query -> pages) shows the broader crawl is at most
+    COVER_MAX_PAGES long; otherwise it is crawled itself, so it is not kept
+    waiting for a large crawl to finish. Returns (queries to crawl, {query: crawl query}).
+    """
+    size_hints = size_hints or {}
+    unique = sorted(set(normalize_query(query) for query in queries), key=len)
+    crawl, covered_by = [], {}
+    for query in unique:
+        parent = next((broader for broader in crawl if set(broader) < set(query)
+                       and size_hints.get(broader, COVER_MAX_PAGES + 1) <= COVER_MAX_PAGES), None)
+        if parent is None:
+            crawl.append(query)
+            covered_by[query] = query
+        else:
+            covered_by[query] = parent
+    return crawl, covered_by
+
+class CrawlScheduler:
+    """Crawls many retail API queries on one shared concurrency and rate budget.
+
+    Work is scheduled one page at a time from a priority queue. The next page
+    of the query with the fewest pages fetched goes first, and queries with
+    more filters (usually smaller) win ties. Small queries therefore finish
+    early while large ones keep the remaining slots busy.
+    """
+
+    def __init__(self, max_concurrency=MAX_CONCURRENCY, requests_per_second=REQUESTS_PER_SECOND, size_hints=None):
+        self.max_concurrency = max_concurrency
+        self.bucket = TokenBucket(requests_per_second, burst=max_concurrency)
+        self.size_hints = {normalize_query(query): pages for query, pages in (size_hints or {}).items()}
+        self.session = requests.Session()
+        self.stats = {"requests": 0, "retries": 0, "errors": 0}
+        self.stats_lock = threading.Lock()
+
+    def count(self, stat):
+        with self.stats_lock:
+            self.stats[stat] += 1
+
+    def fetch_page(self, url):
+        """Fetches one page, backing off on throttling. Returns the JSON body or None."""
+        for attempt in range(MAX_RETRIES):
+            self.bucket.acquire()
+            self.count("requests")
+            try:
+                response = self.session.get(url, timeout=30)
+                if response.status_code == 429 or response.status_code >= 500:
+                    self.count("retries")
+                    time.sleep(retry_after_seconds(response.headers.get("Retry-After"), 2 ** attempt))
+                    continue
+                response.raise_for_status()
+                return response.json()
+            except requests.exceptions.RequestException as e:
+                print(f"Error fetching {url}: {e}")
+                self.count("retries")
+                time.sleep(2 ** attempt)
+        self.count("errors")
+        return None
+
+    def priority(self, query, pages_done):
+        return (pages_done, self.size_hints.get(query, 0), -len(query))
+
+    def run(self, queries, on_result=None):
+        """Crawls all queries and returns {normalized query: items}.
+
+        on_result(query, items) is called as soon as each requested query,
+        including the ones answered from a broader crawl, is complete.
+        """
+        crawl, covered_by = plan_queries(queries, self.size_hints)
+        children = {}
+        for query, parent in covered_by.items():
+            children.setdefault(parent, []).append(query)
+
+        items = {query: [] for query in crawl}
+        pages = dict.fromkeys(crawl, 0)
+        failed = set()
+        results = {}
+        heap = [(self.priority(query, 0), order, query, query_url(query)) for order, query in enumerate(crawl)]
+        heapq.heapify(heap)
+        order = len(heap)
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            running = {}
+            while heap or running:
+                while heap and len(running) < self.max_concurrency:
+                    _, _, query, url = heapq.heappop(heap)
+                    running[executor.submit(self.fetch_page, url)] = query
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    query = running.pop(future)
+                    data = future.result()
+                    if data is None:
+                        failed.add(query)
+                        print(f"[WARNING] Giving up on {filter_string(query) or 'all prices'}")
+                        continue
+                    items[query].extend(data.get("Items", []))
+                    pages[query] += 1
+                    next_url = data.get("NextPageLink")
+                    if next_url:
+                        heapq.heappush(heap, (self.priority(query, pages[query]), order, query, next_url))
+                        order += 1
+                        continue
+
+                    for child in children[query]:
+                        results[child] = items[query] if child == query else [
+                            item for item in items[query] if matches(item, child)]
+                        if on_result:
+                            on_result(child, results[child])
+                    del items[query]
+
+        self.stats["failed_queries"] = len(failed)
+        return results
+
+def grid_queries(fields):
+    """Every combination of the given {field: [values]} as a list of queries."""
+    names = list(fields)
+    return [dict(zip(names, values)) for values in product(*(fields[name] for name in names))]
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl many retail price queries on a shared rate budget.")
+    parser.add_argument("--service-family", nargs="*", default=[], help="serviceFamily values, e.g. Compute Storage")
+    parser.add_argument("--region", nargs="*", default=[], help="armRegionName values")
+    parser.add_argument("--currency", default="USD")
+    parser.add_argument("--queries", help="JSON file with a list of {field: value} queries to crawl as well")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=REQUESTS_PER_SECOND, help="Requests per second")
+    parser.add_argument("--output", help="Write every query's items as NDJSON lines to this file")
+    args = parser.parse_args()
+
+    fields = {"currencyCode": [args.currency]}
+    if args.service_family:
+        fields["serviceFamily"] = args.service_family
+    if args.region:
+        fields["armRegionName"] = args.region
+    queries = grid_queries(fields)
+    if args.queries:
+        with open(args.queries) as f:
+            queries += json.load(f)
+
+    out = open(args.output, "w") if args.output else None
+    started = time.monotonic()
+
+    def on_result(query, query_items):
+        print(f"[{time.monotonic() - started:7.1f}s] {len(query_items):>7,} items  {filter_string(query)}")
+        if out:
+            out.write(json.dumps({"query": dict(query), "items": query_items}) + "\n")
+
+    scheduler = CrawlScheduler(args.concurrency, args.rate)
+    try:
+        results = scheduler.run(queries, on_result)
+    finally:
+        if out:
+            out.close()
+
+    print(f"\nQueries completed: {len(results)}")
+    print(f"API requests     : {scheduler.stats['requests']} ({scheduler.stats['retries']} retries)")
+    print(f"Failed queries   : {scheduler.stats['failed_queries']}")
+    print(f"Elapsed          : {time.monotonic() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()